@@ -0,0 +1,149 @@
+"""
+Benchmark the favicon pipeline in generate_favicons.py stage by stage.
+
+Synthetic masters (dark background, a solid frame of the given border width and
+a colored logo inside) are generated for every size/border combination and each
+stage is timed separately; "total" is the sum of the stages a build runs. The
+plain Pillow PNG save of the same renders is reported apart from it, under
+"baseline_seconds", as the reference for optimize_png. Results are written as
+JSON so runs can be compared across pipeline changes:
+
+    python bench_favicons.py --sizes 256 1024 4096 --borders 0 5 20 -o bench.json
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+import generate_favicons as gf
+
+DEFAULT_SIZES = [256, 512, 1024, 2048, 4096, 8192]
+DEFAULT_BORDERS = [0, 5, 20]  # frame width in percent of the master side
+BACKGROUND = (10, 10, 10)
+FRAME = (90, 90, 90)
+
+
+def make_synthetic_master(side: int, border_pct: int) -> Image.Image:
+    """Dark square with a uniform frame and a colored disc, like our brand masters."""
+    image = Image.new("RGB", (side, side), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    margin = side // 16
+    draw.rectangle((margin, margin, side - margin - 1, side - margin - 1), fill=FRAME)
+    border = margin + side * border_pct // 100
+    inner = (border, border, side - border - 1, side - border - 1)
+    draw.rectangle(inner, fill=(250, 250, 250))
+    inset = max(1, (inner[2] - inner[0]) // 8)
+    draw.ellipse(
+        (inner[0] + inset, inner[1] + inset, inner[2] - inset, inner[3] - inset),
+        fill=(40, 160, 90),
+    )
+    return image
+
+
+def timed(func, *args, repeat: int = 1):
+    """Run func repeat times; return (best seconds, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_case(
+    side: int, border_pct: int, workdir: Path, repeat: int, formats: list[str]
+) -> dict:
+    source_path = workdir / f"master-{side}-{border_pct}.png"
+    make_synthetic_master(side, border_pct).save(source_path, format="PNG")
+
+    stages = {}
+    stages["load_source_image"], src = timed(gf.load_source_image, source_path, repeat=repeat)
+    # make_background_transparent may modify its input in place, so time it on copies
+    stages["make_background_transparent"], processed = timed(
+        lambda: gf.make_background_transparent(src.copy()), repeat=repeat
+    )
+    stages["trim_transparent_borders"], trimmed = timed(
+        gf.trim_transparent_borders, processed, repeat=repeat
+    )
+    stages["trim_uniform_border"], master = timed(gf.trim_uniform_border, trimmed, repeat=repeat)
+
+    sizes = [max(size) for size in [*gf.OUTPUTS.values(), *gf.ICO_SIZES]]
+    stages["resize"], renders = timed(
+        lambda: [gf.fit_square(master, size) for size in sizes], repeat=repeat
+    )
+
+    def encode():
+        for image in renders:
+            image.save(io.BytesIO(), format="PNG")
+
+    # Plain PNG saves of the same renders, kept out of stages (and so out of the
+    # total): it is the reference optimize_png is compared against, not a stage
+    plain_png_save, _ = timed(encode, repeat=repeat)
+    # What render_all actually spends per PNG, with the default build settings
+    stages["optimize_png"], _ = timed(
+        lambda: [gf.optimize_png(image, None, gf.PNG_MAX_ERROR) for image in renders], repeat=repeat
+    )
+    variant_sizes = {max(gf.OUTPUTS[base]) for base, _ in gf.variant_names(formats).values()}
+    variant_renders = list({size: image for size, image in zip(sizes, renders) if size in variant_sizes}.values())
+    for fmt in formats:
+        stages[f"encode_{fmt}"], _ = timed(
+            lambda: [gf.encode_variant(image, fmt) for image in variant_renders], repeat=repeat
+        )
+    stages["total"] = sum(stages.values())
+    return {
+        "side": side,
+        "border_pct": border_pct,
+        "master_size": list(master.size),
+        "seconds": {name: round(value, 6) for name, value in stages.items()},
+        "baseline_seconds": {"plain_png_save": round(plain_png_save, 6)},
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark generate_favicons.py stages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--borders", type=int, nargs="+", default=DEFAULT_BORDERS)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the best is kept")
+    parser.add_argument("--output", "-o", help="write JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = []
+    formats = gf.available_formats()
+    with tempfile.TemporaryDirectory() as tmp:
+        for side in args.sizes:
+            for border_pct in args.borders:
+                case = bench_case(side, border_pct, Path(tmp), args.repeat, formats)
+                results.append(case)
+                print(
+                    f"{side}x{side} border {border_pct}%: {case['seconds']['total']:.3f}s",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "python": platform.python_version(),
+        "pillow": Image.__version__,
+        "numpy": gf.np.__version__ if gf.np is not None else None,
+        "formats": formats,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
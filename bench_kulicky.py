@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mikrobenchmark paměti katalogu kuliček.
+
+Porovná, kolik paměti na položku stojí slovníky {id, text, order_index}
+skládané pro každý požadavek a sdílené instance Kulicka z katalogu, a kolik
+alokací (bloků podle tracemalloc) a času připadne na jeden požadavek na lekci.
+
+    python bench_kulicky.py [--lesson 4] [--requests 1000] [-o bench-kulicky.json]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from kulicky_data import Kulicka, catalog
+
+
+def dict_items(lesson_num):
+    """Tvar odpovědi, jak ho endpointy skládaly před zavedením Kulicka."""
+    items = zip(catalog.lesson(lesson_num), catalog.ids(lesson_num))
+    return [
+        {"id": item_id, "text": text, "order_index": index, "lesson": lesson_num}
+        for index, (text, item_id) in enumerate(items)
+    ]
+
+
+def record_items(lesson_num):
+    return catalog.records(lesson_num)
+
+
+def traced(func, *args, repeat=100):
+    """
+    (bajty, bloky) alokované jedním voláním func, průměr z repeat volání.
+    Výsledky se drží až do změření, aby je free-listy nerecyklovaly.
+    """
+    results = [None] * repeat
+    tracemalloc.start()
+    try:
+        for i in range(repeat):
+            results[i] = func(*args)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = snapshot.statistics("filename")
+    nbytes = sum(stat.size for stat in stats)
+    blocks = sum(stat.count for stat in stats)
+    return nbytes / repeat, blocks / repeat
+
+
+def per_item_memory():
+    """Bajty na položku celého katalogu: slovníky vs. nové instance Kulicka."""
+    lessons = catalog.lessons()
+    dict_bytes, _ = traced(lambda: [dict_items(n) for n in lessons], repeat=10)
+    record_bytes, _ = traced(
+        lambda: [
+            Kulicka(r.lesson, r.index, r.id, r.text)
+            for n in lessons for r in catalog.records(n)
+        ],
+        repeat=10,
+    )
+    total = len(catalog)
+    return {
+        "items": total,
+        "dict_bytes_per_item": round(dict_bytes / total, 1),
+        "record_bytes_per_item": round(record_bytes / total, 1),
+        "dict_sizeof": sys.getsizeof(dict_items(lessons[0])[0]),
+        "record_sizeof": sys.getsizeof(catalog.records(lessons[0])[0]),
+    }
+
+
+def per_request(func, lesson_num, requests):
+    nbytes, blocks = traced(func, lesson_num)
+    start = time.perf_counter()
+    for _ in range(requests):
+        func(lesson_num)
+    elapsed = time.perf_counter() - start
+    return {
+        "items": len(func(lesson_num)),
+        "bytes": round(nbytes, 1),
+        "blocks": round(blocks, 1),
+        "us_per_request": round(elapsed / requests * 1e6, 2),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Paměť a alokace katalogu kuliček.")
+    parser.add_argument("--lesson", type=int, default=4, help="lekce pro měření požadavků")
+    parser.add_argument("--requests", type=int, default=1000, help="počet opakování pro časování")
+    parser.add_argument("-o", "--output", help="zapsat JSON do souboru")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        "python": platform.python_version(),
+        "memory": per_item_memory(),
+        "request": {
+            "lesson": args.lesson,
+            "dicts": per_request(dict_items, args.lesson, args.requests),
+            "records": per_request(record_items, args.lesson, args.requests),
+        },
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statické JSON balíčky katalogu kuliček pro nginx.
+
+Pro každou lekci a pro celý katalog vznikne JSON s hashem obsahu v názvu
+(lesson-4.<hash>.json, catalog.<hash>.json) a vedle něj předkomprimované
+.gz a .br varianty, takže nginx je servíruje přes gzip_static/brotli_static
+s immutable cache (viz location /catalog/ v nginx.conf; image s nginx staví
+Dockerfile.catalog). Frontend si nejdřív načte krátce cachovaný index.json
+s aktuálními názvy souborů.
+
+    python build_catalog_bundles.py [--out-dir catalog]
+
+.br vzniká jen s nainstalovaným balíčkem brotli (Dockerfile.catalog ho instaluje).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from kulicky_data import catalog, lesson_titles
+
+try:
+    import brotli
+except ImportError:  # .br varianty se pak přeskočí
+    brotli = None
+
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog")
+INDEX_FILENAME = "index.json"
+# Soubory, které tento skript generuje (kvůli úklidu starých verzí)
+_BUNDLE_RE = re.compile(r"^(lesson-\d+|catalog)\.[0-9a-f]{12}\.json(\.gz|\.br)?$")
+
+
+def lesson_payload(lesson_num):
+    return {
+        "lesson": lesson_num,
+        "title": lesson_titles.get(lesson_num),
+        "count": catalog.count(lesson_num),
+        "kulicky": [
+            {"id": record.id, "text": record.text, "order_index": record.index}
+            for record in catalog.records(lesson_num)
+        ],
+    }
+
+
+def serialize(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_bundle(out_dir, stem, data):
+    """Zapíše stem.<hash>.json + .gz (+ .br) a vrátí název JSON souboru."""
+    filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.json"
+    variants = {filename: data, filename + ".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants[filename + ".br"] = brotli.compress(data, quality=11)
+    for name, content in variants.items():
+        path = os.path.join(out_dir, name)
+        # Se stejným hashem je obsah stejný; nepřepisovat, ať zůstane mtime/ETag
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(content)
+    return filename, {name: len(content) for name, content in variants.items()}
+
+
+def build(out_dir=DEFAULT_OUT_DIR):
+    """Vygeneruje balíčky a index.json; vrátí index a velikosti souborů."""
+    os.makedirs(out_dir, exist_ok=True)
+    sizes = {}
+    lessons = {}
+    payloads = []
+    for lesson_num in catalog.lessons():
+        payload = lesson_payload(lesson_num)
+        payloads.append(payload)
+        filename, written = write_bundle(out_dir, f"lesson-{lesson_num}", serialize(payload))
+        lessons[str(lesson_num)] = filename
+        sizes.update(written)
+
+    catalog_file, written = write_bundle(out_dir, "catalog", serialize({"lessons": payloads}))
+    sizes.update(written)
+
+    index = {"catalog": catalog_file, "lessons": lessons}
+    index_data = json.dumps(index, ensure_ascii=False, indent=2).encode("utf-8") + b"\n"
+    with open(os.path.join(out_dir, INDEX_FILENAME), "wb") as f:
+        f.write(index_data)
+
+    current = set(sizes)
+    for name in os.listdir(out_dir):
+        if _BUNDLE_RE.match(name) and name not in current:
+            os.remove(os.path.join(out_dir, name))
+    return index, sizes
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Statické JSON balíčky katalogu pro nginx.")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index, sizes = build(args.out_dir)
+    raw = sum(size for name, size in sizes.items() if name.endswith(".json"))
+    gz = sum(size for name, size in sizes.items() if name.endswith(".gz"))
+    print(f"{len(index['lessons'])} lekcí + katalog v {args.out_dir}: JSON {raw} B, gzip {gz} B", end="")
+    if brotli is None:
+        print(" (brotli není nainstalované, .br přeskočeno)")
+    else:
+        br = sum(size for name, size in sizes.items() if name.endswith(".br"))
+        print(f", brotli {br} B")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kontrola kvality katalogu kuliček, dost rychlá na pre-commit hook.
+
+Hlásí:
+  - přesné duplicity v rámci lekce (chyba) a napříč lekcemi (varování),
+  - téměř shodné kuličky (MinHash nad znakovými 3-gramy + LSH, ověřené
+    Jaccardovou podobností), takže se neporovnává každá dvojice,
+  - lekce, které jsou z velké části kopií jiné lekce, ale rozešly se,
+  - nejednotné zkratky ("přes." vedle "přesvědčení").
+
+    python check_kulicky.py [--threshold 0.7] [--strict] [--json]
+    python check_kulicky.py --update-baseline   # přijmout současné nálezy
+
+Nálezy zapsané v check_kulicky_baseline.json jsou známé: vypíšou se, ale
+neblokují. Návratový kód je 1, pokud se najde nová chyba (s --strict i nové
+varování), takže kontrola může hlídat každý commit, aniž by se nejdřív
+musely opravit všechny staré nálezy.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from collections import Counter
+
+from kulicky_data import catalog, normalize
+
+SHINGLE_SIZE = 3
+# One-permutation MinHash: jeden hash na 3-gram, rozsah rozdělený do BINS košů
+BINS = 16
+ROWS_PER_BAND = 2
+DEFAULT_THRESHOLD = 0.7
+DRIFT_OVERLAP = 0.5
+_BIN_WIDTH = (1 << 32) // BINS
+_ABBREVIATION_RE = re.compile(r"(\w+)\.(?=[\s,])")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "check_kulicky_baseline.json")
+
+
+def shingles(text):
+    padded = f" {normalize(text)} "
+    if len(padded) <= SHINGLE_SIZE:
+        return {padded}
+    return {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def signature(shingle_set):
+    """Minimum hashe v každém koši; prázdný koš zůstane None."""
+    mins = [None] * BINS
+    for shingle in shingle_set:
+        value = zlib.crc32(shingle.encode("utf-8"))
+        slot = value // _BIN_WIDTH
+        if mins[slot] is None or value < mins[slot]:
+            mins[slot] = value
+    return mins
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def find_exact_duplicates(items):
+    """Skupiny stejných textů: (text, [(lekce, pozice), ...])."""
+    groups = []
+    seen = set()
+    for lesson_num, index, text in items:
+        if text in seen:
+            continue
+        seen.add(text)
+        positions = catalog.positions(text)
+        if len(positions) > 1:
+            groups.append((text, list(positions)))
+    return groups
+
+
+def find_near_duplicates(items, threshold=DEFAULT_THRESHOLD):
+    """
+    Dvojice různých textů s Jaccardovou podobností 3-gramů >= threshold.
+    Kandidáti se berou jen z LSH košů (pásy po ROWS_PER_BAND hodnotách podpisu).
+    """
+    texts = [text for _, _, text in items]
+    sets = [shingles(text) for text in texts]
+    buckets = {}
+    for ordinal, shingle_set in enumerate(sets):
+        sig = signature(shingle_set)
+        for band in range(0, BINS, ROWS_PER_BAND):
+            key = (band, *sig[band:band + ROWS_PER_BAND])
+            # Pás s prázdným košem by spojoval krátké texty bez ohledu na obsah
+            if None not in key:
+                buckets.setdefault(key, []).append(ordinal)
+
+    checked = set()
+    pairs = {}
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if (a, b) in checked:
+                    continue
+                checked.add((a, b))
+                size_a, size_b = len(sets[a]), len(sets[b])
+                # Jaccard nemůže přesáhnout poměr velikostí množin
+                if min(size_a, size_b) < threshold * max(size_a, size_b) or texts[a] == texts[b]:
+                    continue
+                similarity = jaccard(sets[a], sets[b])
+                if similarity >= threshold:
+                    pairs[(a, b)] = similarity
+    return [
+        (items[a][:2], items[b][:2], texts[a], texts[b], similarity)
+        for (a, b), similarity in sorted(pairs.items())
+    ]
+
+
+def find_drifted_lessons(exact_groups, near_pairs):
+    """Dvojice lekcí, jejichž kuličky se z velké části (ale ne zcela) shodují."""
+    shared = Counter()
+    for _, positions in exact_groups:
+        lessons = sorted({lesson_num for lesson_num, _ in positions})
+        for i, a in enumerate(lessons):
+            for b in lessons[i + 1:]:
+                shared[(a, b)] += 1
+    for (lesson_a, _), (lesson_b, _), *_ in near_pairs:
+        if lesson_a != lesson_b:
+            shared[tuple(sorted((lesson_a, lesson_b)))] += 1
+
+    drifted = []
+    for (a, b), count in sorted(shared.items()):
+        overlap = count / min(catalog.count(a), catalog.count(b))
+        if overlap >= DRIFT_OVERLAP and catalog.lesson(a) != catalog.lesson(b):
+            drifted.append((a, b, round(overlap, 3)))
+    return drifted
+
+
+def find_abbreviations(items):
+    """Zkratky typu "přes." u slov, která se jinde píšou celá."""
+    words = Counter(word for _, _, text in items for word in re.findall(r"\w+", text.casefold()))
+    findings = []
+    for lesson_num, index, text in items:
+        for match in _ABBREVIATION_RE.finditer(text):
+            stem = match.group(1).casefold()
+            expansions = [(n, w) for w, n in words.items() if w.startswith(stem) and len(w) > len(stem)]
+            if expansions:
+                findings.append(((lesson_num, index), match.group(0), max(expansions)[1], text))
+    return findings
+
+
+def run_checks(threshold=DEFAULT_THRESHOLD):
+    items = list(catalog)
+    exact = find_exact_duplicates(items)
+    near = find_near_duplicates(items, threshold)
+    return {
+        "exact_duplicates": exact,
+        "near_duplicates": near,
+        "drifted_lessons": find_drifted_lessons(exact, near),
+        "abbreviations": find_abbreviations(items),
+    }
+
+
+def finding_key(kind, finding):
+    """
+    Klíč nálezu bez pozic (podle textů, u rozjetých lekcí podle čísel lekcí),
+    aby známý nález zůstal známým i po přeřazení nebo vložení kuliček.
+    """
+    if kind == "exact_duplicates":
+        return (kind, finding[0])
+    if kind == "near_duplicates":
+        return (kind, finding[2], finding[3])
+    if kind == "drifted_lessons":
+        return (kind, finding[0], finding[1])
+    return (kind, finding[3])
+
+
+def load_baseline(path=BASELINE_PATH):
+    """Klíče známých nálezů; chybějící soubor znamená prázdnou baseline."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {tuple(key) for key in json.load(f)["known"]}
+    except FileNotFoundError:
+        return set()
+
+
+def save_baseline(report, path=BASELINE_PATH):
+    keys = sorted(
+        (finding_key(kind, finding) for kind, findings in report.items() for finding in findings),
+        key=lambda key: [str(part) for part in key],
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"known": [list(key) for key in keys]}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return len(keys)
+
+
+def split_errors(report, baseline=frozenset()):
+    """
+    (chyby, varování) mimo baseline. Chyby jsou přesné duplicity v rámci
+    jedné lekce, zbytek jsou varování.
+    """
+    errors = []
+    warnings = 0
+    for kind, findings in report.items():
+        for finding in findings:
+            if finding_key(kind, finding) in baseline:
+                continue
+            if kind == "exact_duplicates" and len({n for n, _ in finding[1]}) < len(finding[1]):
+                errors.append(finding)
+            else:
+                warnings += 1
+    return errors, warnings
+
+
+def report_to_json(report):
+    """Nálezy jako seznamy slovníků pro --json."""
+    return {
+        "exact_duplicates": [
+            {"text": text, "positions": positions} for text, positions in report["exact_duplicates"]
+        ],
+        "near_duplicates": [
+            {"a": a, "b": b, "text_a": text_a, "text_b": text_b, "similarity": round(similarity, 3)}
+            for a, b, text_a, text_b, similarity in report["near_duplicates"]
+        ],
+        "drifted_lessons": [
+            {"lessons": [a, b], "overlap": overlap} for a, b, overlap in report["drifted_lessons"]
+        ],
+        "abbreviations": [
+            {"position": position, "abbreviation": abbreviation, "expansion": expansion, "text": text}
+            for position, abbreviation, expansion, text in report["abbreviations"]
+        ],
+    }
+
+
+def print_report(report, baseline=frozenset()):
+    def known(kind, finding):
+        return " (známé)" if finding_key(kind, finding) in baseline else ""
+
+    for finding in report["exact_duplicates"]:
+        text, positions = finding
+        where = ", ".join(f"{lesson_num}/{index}" for lesson_num, index in positions)
+        print(f"DUPLICITA  {text!r}: {where}{known('exact_duplicates', finding)}")
+    for finding in report["near_duplicates"]:
+        (la, ia), (lb, ib), text_a, text_b, similarity = finding
+        print(f"PODOBNÉ    {la}/{ia} {text_a!r} ~ {lb}/{ib} {text_b!r} ({similarity:.2f})"
+              f"{known('near_duplicates', finding)}")
+    for finding in report["drifted_lessons"]:
+        a, b, overlap = finding
+        print(f"ROZJETÉ    lekce {a} a {b} sdílí {overlap:.0%} kuliček, ale nejsou shodné"
+              f"{known('drifted_lessons', finding)}")
+    for finding in report["abbreviations"]:
+        (lesson_num, index), abbreviation, expansion, text = finding
+        print(f"ZKRATKA    {lesson_num}/{index} {abbreviation!r} (jinde {expansion!r}): {text!r}"
+              f"{known('abbreviations', finding)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kontrola duplicit a konzistence katalogu kuliček.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="minimální Jaccardova podobnost pro téměř shodné kuličky")
+    parser.add_argument("--strict", action="store_true", help="selhat i na varováních")
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="soubor se známými nálezy (výchozí: check_kulicky_baseline.json)")
+    parser.add_argument("--no-baseline", action="store_true", help="brát všechny nálezy jako nové")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="zapsat současné nálezy jako známé a skončit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    report = run_checks(args.threshold)
+    elapsed = time.perf_counter() - started
+    if args.update_baseline:
+        count = save_baseline(report, args.baseline)
+        print(f"Baseline {args.baseline}: {count} známých nálezů", file=sys.stderr)
+        return 0
+    baseline = frozenset() if args.no_baseline else load_baseline(args.baseline)
+    errors, warnings = split_errors(report, baseline)
+    known = sum(len(findings) for findings in report.values()) - len(errors) - warnings
+
+    if args.json:
+        print(json.dumps(report_to_json(report), ensure_ascii=False, indent=2))
+    else:
+        print_report(report, baseline)
+        print(f"{len(catalog)} kuliček zkontrolováno za {elapsed * 1000:.1f} ms: "
+              f"{len(errors)} chyb, {warnings} varování, {known} známých", file=sys.stderr)
+    if errors or (args.strict and warnings):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
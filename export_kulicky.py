@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export kuliček z kulicky_data do TXT, CSV, JSON Lines, NDJSON.gz a Parquet.
+
+Záznamy (lekce, pozice, id, text) jdou jedním průchodem přes katalog a každý
+záznam se hned předá všem zvoleným writerům, které zapisují do bufferovaných
+souborů - nikde nevzniká celý dokument jako jeden řetězec.
+
+    python export_kulicky.py --formats txt csv jsonl --out-dir export
+    python export_kulicky.py --lessons 4 --formats txt --output lesson4_kulicky_final.txt
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+
+from kulicky_data import catalog, lesson_titles
+
+FORMATS = {
+    "txt": ".txt",
+    "csv": ".csv",
+    "jsonl": ".jsonl",
+    "ndjson-gz": ".ndjson.gz",
+    "parquet": ".parquet",
+}
+CSV_FIELDS = ("lesson", "index", "id", "text")
+
+_BUFFER_SIZE = 256 * 1024
+_PARQUET_BATCH = 1024
+
+
+def iter_records(lessons=None):
+    """(lekce, pozice, id, text) pro vybrané lekce (výchozí: všechny)."""
+    wanted = catalog.lessons() if lessons is None else lessons
+    for lesson_num in wanted:
+        for record in catalog.records(lesson_num):
+            yield record.lesson, record.index, record.id, record.text
+
+
+def _open_text(path):
+    return open(path, "w", encoding="utf-8", newline="", buffering=_BUFFER_SIZE)
+
+
+class TxtWriter:
+    """Čitelný seznam po lekcích ve formátu create_new_kulicky_data.py."""
+
+    def __init__(self, path):
+        self._file = _open_text(path)
+        self._lesson = None
+
+    def write(self, record):
+        lesson_num, index, _, text = record
+        if lesson_num != self._lesson:
+            if self._lesson is not None:
+                self._file.write("\n")
+            title = lesson_titles.get(lesson_num)
+            header = f"Lekce {lesson_num} - {title}" if title else f"Lekce {lesson_num}"
+            self._file.write(f"{header}\n{'=' * 40}\n\n")
+            self._lesson = lesson_num
+        self._file.write(f"{index + 1}. {text}\n")
+
+    def close(self):
+        self._file.close()
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self._file = _open_text(path)
+        self._writer = csv.writer(self._file, lineterminator="\n")
+        self._writer.writerow(CSV_FIELDS)
+
+    def write(self, record):
+        self._writer.writerow(record)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonLinesWriter:
+    def __init__(self, path):
+        self._file = self._open(path)
+
+    def _open(self, path):
+        return _open_text(path)
+
+    def write(self, record):
+        line = json.dumps(dict(zip(CSV_FIELDS, record)), ensure_ascii=False)
+        self._file.write(line + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class GzipJsonLinesWriter(JsonLinesWriter):
+    """NDJSON v gzipu; mtime=0, aby stejná data dala stejné bajty."""
+
+    def _open(self, path):
+        raw = gzip.GzipFile(path, "wb", compresslevel=9, mtime=0)
+        return io.TextIOWrapper(io.BufferedWriter(raw, _BUFFER_SIZE), encoding="utf-8", newline="")
+
+
+class ParquetWriter:
+    """Parquet přes pyarrow (volitelná závislost), zapisuje po dávkách."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Export do Parquet vyžaduje pyarrow (pip install pyarrow)") from None
+        self._pa = pa
+        self._schema = pa.schema(
+            [("lesson", pa.int16()), ("index", pa.int32()), ("id", pa.string()), ("text", pa.string())]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+        self._batch = []
+
+    def write(self, record):
+        self._batch.append(record)
+        if len(self._batch) >= _PARQUET_BATCH:
+            self._flush()
+
+    def _flush(self):
+        if self._batch:
+            columns = [list(column) for column in zip(*self._batch)]
+            self._writer.write_batch(self._pa.record_batch(columns, schema=self._schema))
+            self._batch = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+WRITERS = {
+    "txt": TxtWriter,
+    "csv": CsvWriter,
+    "jsonl": JsonLinesWriter,
+    "ndjson-gz": GzipJsonLinesWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def export(targets, lessons=None):
+    """
+    Zapíše vybrané lekce do všech cílů {formát: cesta} jedním průchodem
+    a vrátí počet exportovaných kuliček.
+    """
+    writers = []
+    try:
+        for fmt, path in targets.items():
+            writers.append(WRITERS[fmt](path))
+        count = 0
+        for record in iter_records(lessons):
+            for writer in writers:
+                writer.write(record)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export kuliček do souborů.")
+    parser.add_argument("--lessons", type=int, nargs="+", help="jen tyto lekce (výchozí: všechny)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["txt"])
+    parser.add_argument("--out-dir", default=".", help="adresář pro výstupy")
+    parser.add_argument("--name", default="kulicky", help="základ názvu souborů")
+    parser.add_argument("--output", help="přesná cesta výstupu (jen s jedním formátem)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.output:
+        if len(args.formats) != 1:
+            raise SystemExit("--output lze použít jen s jedním formátem")
+        targets = {args.formats[0]: args.output}
+    else:
+        os.makedirs(args.out_dir, exist_ok=True)
+        targets = {
+            fmt: os.path.join(args.out_dir, args.name + FORMATS[fmt])
+            for fmt in dict.fromkeys(args.formats)
+        }
+    count = export(targets, lessons=args.lessons)
+    for path in targets.values():
+        print(f"Zapsán {path}")
+    print(f"Exportováno {count} kuliček")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
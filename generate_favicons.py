@@ -1,6 +1,28 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import struct
 import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from PIL import Image, ImageChops
+from typing import NamedTuple
+
+from PIL import Image, ImageChops, ImageStat, features
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then not reported
+    resource = None
 
 # Configuration
 DEFAULT_SOURCE = "Abstraktní strom.png"  # Fallback if new file not present
@@ -15,10 +37,64 @@ OUTPUTS = {
     "android-chrome-256x256.png": (256, 256),
     "android-chrome-512x512.png": (512, 512),
     "mstile-150x150.png": (150, 150),
-    # maskable icon (transparent padding around) commonly 512x512
+    # maskable icon (padded, opaque background) commonly 512x512
     "maskable-icon-512x512.png": (512, 512),
 }
+# Outputs rendered as maskable icons: the content stays inside the central
+# safe zone (a circle of 40% radius, i.e. 80% of the side) on an opaque background
+MASKABLE_OUTPUTS = {"maskable-icon-512x512.png"}
+MASKABLE_SAFE_ZONE = 0.8
+MASKABLE_BACKGROUND = (0, 0, 0, 255)  # the dark background removed from the master
+# Modern formats written next to every PNG in OUTPUTS when Pillow can encode
+# them locally: format -> (Pillow format, MIME type, save options)
+MODERN_FORMATS = {
+    "avif": ("AVIF", "image/avif", {"quality": 80}),
+    "webp": ("WEBP", "image/webp", {"quality": 90, "method": 5}),
+}
+# Web app manifests whose "icons" list is regenerated after every run
+WEB_MANIFESTS = ["site.webmanifest", "manifest.webmanifest"]
 ICO_SIZES = [(16, 16), (32, 32), (48, 48), (64, 64)]
+ICO_FILENAME = "favicon.ico"
+# Tolerances used when preparing the master (see prepare_master)
+BACKGROUND_TOLERANCE = 30
+BORDER_TOLERANCE = 6
+# Records the inputs and output hashes of the last run for incremental rebuilds
+MANIFEST_FILENAME = ".favicons-manifest.json"
+MANIFEST_VERSION = 1
+# "direct" resizes every size from the full master; "progressive" first builds
+# one intermediate for the largest size (see progressive_base)
+RESAMPLE_MODES = ("direct", "progressive")
+# PNG size optimization (see optimize_png): the largest RMS error, in
+# premultiplied RGBA on a 0-255 scale, at which a palette-quantized image still
+# replaces the truecolor one (0 = only when lossless)
+PNG_MAX_ERROR = 0.0
+# (compress_level, zlib strategy, relative encode cost) tried for every
+# candidate image, best first. Costs are measured per raw byte against level 1;
+# Z_RLE ignores the level and is as cheap as level 1.
+PNG_ENCODINGS = [
+    (9, zlib.Z_DEFAULT_STRATEGY, 12),
+    (9, zlib.Z_FILTERED, 12),
+    (9, zlib.Z_RLE, 1),
+    (6, zlib.Z_DEFAULT_STRATEGY, 2),
+    (6, zlib.Z_FILTERED, 2),
+    (9, zlib.Z_FIXED, 12),
+]
+# Encode effort per candidate image, in raw bytes times relative cost. An
+# encoding whose cost would exceed it is skipped, so large truecolor images try
+# fewer settings than small or palette ones; the choice depends only on the
+# image, never on machine speed.
+PNG_EFFORT = 16 * 2**20
+# Memory-bounded mode (--memory-limit): estimated peak bytes per master pixel
+# while preparing it (RGBA master plus the copies prepare_master makes),
+# bytes per pixel of one strip in the mask passes, and the smallest master
+# kept, relative to the largest output
+MASTER_BYTES_PER_PIXEL = 16
+STRIP_BYTES_PER_PIXEL = 32
+MIN_MASTER_HEADROOM = 4
+# Batch mode (--batch): source images picked up from a directory, and the
+# directory that gets one output subdirectory per brand
+BATCH_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp"}
+BATCH_OUTPUT_ROOT = "favicons"
 
 
 def load_source_image(path: Path) -> Image.Image:
@@ -26,26 +102,107 @@ def load_source_image(path: Path) -> Image.Image:
     return image
 
 
+def bounded_reduce_factor(size: tuple[int, int], memory_limit: int, largest: int) -> int:
+    """
+    Integer downscale factor for a master of the given size: large enough
+    that the prepared master fits memory_limit bytes, and as large as possible
+    while the master keeps MIN_MASTER_HEADROOM x the largest output.
+    """
+    if memory_limit <= 0:
+        raise ValueError(f"memory_limit must be positive, got {memory_limit}")
+    width, height = size
+    factor = max(1, min(width, height) // (MIN_MASTER_HEADROOM * largest))
+    while (width // factor) * (height // factor) * MASTER_BYTES_PER_PIXEL > memory_limit:
+        factor += 1
+    return factor
+
+
+def strip_rows(width: int, memory_limit: int) -> int:
+    """Rows per strip so one strip's temporaries use at most 1/8 of memory_limit."""
+    return max(1, memory_limit // 8 // (max(1, width) * STRIP_BYTES_PER_PIXEL))
+
+
+def _reduce_in_strips(image: Image.Image, factor: int, rows: int) -> Image.Image:
+    """
+    image.reduce(factor) to RGBA, one horizontal strip at a time, so only the
+    decoded source and one strip are in memory. Alpha is reduced premultiplied,
+    as in progressive_base; edge rows/columns beyond a multiple of factor are
+    dropped.
+    """
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    mode = "RGBA" if has_alpha else "RGB"
+    width, height = (image.width // factor) * factor, (image.height // factor) * factor
+    reduced = Image.new("RGBA", (width // factor, height // factor))
+    rows = max(factor, rows // factor * factor)
+    for top in range(0, height, rows):
+        strip = image.crop((0, top, width, min(top + rows, height))).convert(mode)
+        if has_alpha:
+            strip = strip.convert("RGBa").reduce(factor).convert("RGBA")
+        else:
+            strip = strip.reduce(factor).convert("RGBA")
+        reduced.paste(strip, (0, top // factor))
+    return reduced
+
+
+def load_source_bounded(path: Path, memory_limit: int, largest: int) -> Image.Image:
+    """
+    Load the source already downscaled for memory-bounded mode. JPEGs are
+    scaled while decoding (Image.draft, 1/2 to 1/8); other formats are decoded
+    in their own mode (often 1-3 bytes per pixel instead of RGBA's 4) and
+    reduced strip by strip. Output is an RGBA image like load_source_image.
+    The limit covers the source and master buffers, not the interpreter or
+    the encoders used while rendering.
+    """
+    image = Image.open(path)
+    factor = bounded_reduce_factor(image.size, memory_limit, largest)
+    if factor > 1 and image.format == "JPEG":
+        image.draft("RGB", (image.width // factor, image.height // factor))
+        factor = bounded_reduce_factor(image.size, memory_limit, largest)
+    decoded = image.width * image.height * len(image.getbands())
+    if decoded > memory_limit:
+        print(
+            f"Warning: {image.format} cannot be downscaled while decoding; the full decode "
+            f"needs {decoded / 2**20:.0f} MB, above the {memory_limit / 2**20:.0f} MB limit",
+            file=sys.stderr,
+        )
+    if factor == 1:
+        return image.convert("RGBA")
+    return _reduce_in_strips(image, factor, strip_rows(image.width, memory_limit))
+
+
+def peak_rss_mb() -> tuple[float, float] | None:
+    """Peak resident set size of this process and of its finished workers, in MB."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return own / 2**20, children / 2**20
+
+
 def color_distance(c1, c2) -> int:
     return sum((c1[i] - c2[i]) ** 2 for i in range(3))
 
 
-def make_background_transparent(image: Image.Image, tolerance: int = 30) -> Image.Image:
+def make_background_transparent(
+    image: Image.Image, tolerance: int = BACKGROUND_TOLERANCE, rows: int | None = None
+) -> Image.Image:
     """
     Make uniform dark background transparent by sampling the four corners and
     removing pixels near that color. Keeps white ring and colored logo.
+    With rows, the numpy path works on strips of that many rows at a time.
     """
     if image.mode != "RGBA":
         image = image.convert("RGBA")
-    rgb = image.convert("RGB")
     width, height = image.size
 
     # Sample corners to estimate background color
     samples = [
-        rgb.getpixel((0, 0)),
-        rgb.getpixel((width - 1, 0)),
-        rgb.getpixel((0, height - 1)),
-        rgb.getpixel((width - 1, height - 1)),
+        image.getpixel((0, 0)),
+        image.getpixel((width - 1, 0)),
+        image.getpixel((0, height - 1)),
+        image.getpixel((width - 1, height - 1)),
     ]
     # Average corner color
     avg = tuple(sum(c[i] for c in samples) // 4 for i in range(3))
@@ -54,6 +211,9 @@ def make_background_transparent(image: Image.Image, tolerance: int = 30) -> Imag
     if sum(avg) / 3 > 40:
         return image  # not a dark background
 
+    if np is not None:
+        return _clear_background_numpy(image, avg, tolerance, rows)
+
     px = image.load()
     for y in range(height):
         for x in range(width):
@@ -66,57 +226,71 @@ def make_background_transparent(image: Image.Image, tolerance: int = 30) -> Imag
     return image
 
 
+def _clear_background_numpy(
+    image: Image.Image, avg, tolerance: int, rows: int | None = None
+) -> Image.Image:
+    """
+    Vectorized equivalent of the per-pixel loop in make_background_transparent.
+    The int32 temporaries exist for one strip of rows at a time; only the new
+    alpha channel is kept for the whole image and put back in place.
+    """
+    width, height = image.size
+    rows = height if rows is None else rows
+    alpha = np.empty((height, width), dtype=np.uint8)
+    background = np.asarray(avg, dtype=np.int32)
+    for top in range(0, height, rows):
+        strip = np.asarray(image.crop((0, top, width, min(top + rows, height))), dtype=np.uint8)
+        diff = strip[..., :3].astype(np.int32) - background
+        distance = np.einsum("ijk,ijk->ij", diff, diff)
+        strip_alpha = alpha[top:top + len(strip)]
+        strip_alpha[...] = strip[..., 3]
+        strip_alpha[distance <= tolerance * tolerance] = 0
+    image.putalpha(Image.fromarray(alpha, "L"))
+    return image
+
+
 def trim_transparent_borders(image: Image.Image) -> Image.Image:
     """Trim fully transparent borders to maximize visible area."""
     if image.mode != "RGBA":
         return image
-    alpha = image.split()[-1]
+    alpha = image.getchannel("A")
     bbox = alpha.getbbox()
     if bbox:
         return image.crop(bbox)
     return image
 
 
-def trim_uniform_border(image: Image.Image, tolerance: int = 6) -> Image.Image:
+def trim_uniform_border(
+    image: Image.Image, tolerance: int = BORDER_TOLERANCE, rows: int | None = None
+) -> Image.Image:
     """If the image has no transparency, trim borders that match the corner color.
     This helps remove solid background rings/boxes (e.g., black background).
+    With rows, the mask is built for strips of that many rows at a time.
     """
     if image.mode not in ("RGB", "RGBA"):
         return image
-    rgb = image.convert("RGB")
-    width, height = rgb.size
-    corner_color = rgb.getpixel((0, 0))
-
-    def is_similar(c1, c2) -> bool:
-        return all(abs(c1[i] - c2[i]) <= tolerance for i in range(3))
-
-    left = 0
-    while left < width:
-        col = rgb.crop((left, 0, left + 1, height))
-        if any(not is_similar(px, corner_color) for px in col.getdata()):
-            break
-        left += 1
-
-    right = width - 1
-    while right >= 0:
-        col = rgb.crop((right, 0, right + 1, height))
-        if any(not is_similar(px, corner_color) for px in col.getdata()):
-            break
-        right -= 1
-
-    top = 0
-    while top < height:
-        row = rgb.crop((0, top, width, top + 1))
-        if any(not is_similar(px, corner_color) for px in row.getdata()):
-            break
-        top += 1
-
-    bottom = height - 1
-    while bottom >= 0:
-        row = rgb.crop((0, bottom, width, bottom + 1))
-        if any(not is_similar(px, corner_color) for px in row.getdata()):
-            break
-        bottom -= 1
+    width, height = image.size
+    corner_color = image.getpixel((0, 0))[:3]
+    rows = height if rows is None else rows
+
+    # Per-channel |pixel - corner| > tolerance marks content; the bounding box
+    # of that mask gives all four edges in one pass per strip.
+    background = Image.new("RGB", (width, min(rows, height)), corner_color)
+    boxes = []
+    for strip_top in range(0, height, rows):
+        rgb = image.crop((0, strip_top, width, min(strip_top + rows, height))).convert("RGB")
+        if rgb.size != background.size:
+            background = background.crop((0, 0, *rgb.size))
+        diff = ImageChops.difference(rgb, background)
+        box = diff.point(lambda v: 255 if v > tolerance else 0).getbbox()
+        if box is not None:
+            boxes.append((box[0], box[1] + strip_top, box[2], box[3] + strip_top))
+    if not boxes:
+        return image
+    left = min(box[0] for box in boxes)
+    top = min(box[1] for box in boxes)
+    right = max(box[2] for box in boxes) - 1
+    bottom = max(box[3] for box in boxes) - 1
 
     # If crop would remove everything or nothing, return original
     if left >= right or top >= bottom:
@@ -126,46 +300,526 @@ def trim_uniform_border(image: Image.Image, tolerance: int = 6) -> Image.Image:
     return image.crop((left, top, right + 1, bottom + 1))
 
 
-def make_square(image: Image.Image, size: int) -> Image.Image:
+def prepare_master(image: Image.Image, rows: int | None = None) -> Image.Image:
     """
-    Fit the source image into a square canvas while preserving aspect ratio.
-    Trims background and borders first, then applies padding (currently 0%).
+    Run the expensive preprocessing once: remove the dark background, then trim
+    transparent and uniform borders. Every output size is resized from the result.
+    rows bounds the mask passes to strips of that many rows (see strip_rows).
     """
     # Remove dark background -> transparent
-    processed = make_background_transparent(image)
+    processed = make_background_transparent(image, BACKGROUND_TOLERANCE, rows)
     # First trim transparent borders, then attempt to trim a uniform border color
     trimmed = trim_transparent_borders(processed)
-    trimmed = trim_uniform_border(trimmed)
-    src_w, src_h = trimmed.size
+    return trim_uniform_border(trimmed, BORDER_TOLERANCE, rows)
+
+
+def fitted_size(
+    src_size: tuple[int, int], size: int, padding: float = PADDING_RATIO
+) -> tuple[int, int]:
+    """Dimensions of the content inside a size x size canvas after padding."""
+    src_w, src_h = src_size
 
     # Leave a small padding so content doesn't touch edges
-    inner_size = int(size * (1.0 - 2 * PADDING_RATIO))
+    inner_size = int(size * (1.0 - 2 * padding))
     inner_size = max(1, inner_size)
 
     scale = min(inner_size / src_w, inner_size / src_h)
-    new_w, new_h = max(1, int(src_w * scale)), max(1, int(src_h * scale))
-    resized = trimmed.resize((new_w, new_h), Image.LANCZOS)
+    return max(1, int(src_w * scale)), max(1, int(src_h * scale))
+
+
+def fit_square(
+    master: Image.Image,
+    size: int,
+    padding: float = PADDING_RATIO,
+    background: tuple[int, int, int, int] | None = None,
+) -> Image.Image:
+    """
+    Fit an already prepared master into a square canvas while preserving aspect
+    ratio and applying padding (currently 0%), optionally over a background.
+    """
+    new_w, new_h = fitted_size(master.size, size, padding)
+    resized = master.resize((new_w, new_h), Image.LANCZOS)
 
     canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     offset = ((size - new_w) // 2, (size - new_h) // 2)
     canvas.paste(resized, offset, resized)
+    if background is not None:
+        # alpha_composite, not paste: paste would blend the alpha channel too
+        canvas = Image.alpha_composite(Image.new("RGBA", (size, size), background), canvas)
     return canvas
 
 
-def save_pngs(src: Image.Image, project_root: Path) -> None:
-    for filename, (w, h) in OUTPUTS.items():
-        out_img = make_square(src, max(w, h))
-        out_path = project_root / filename
-        out_img.save(out_path, format="PNG")
-        print(f"Wrote {out_path} ({w}x{h})")
+def fit_maskable(master: Image.Image, size: int) -> Image.Image:
+    """Maskable icon: content inside MASKABLE_SAFE_ZONE on an opaque background."""
+    padding = (1.0 - MASKABLE_SAFE_ZONE) / 2
+    return fit_square(master, size, padding, MASKABLE_BACKGROUND)
+
+
+def progressive_base(master: Image.Image, size: int) -> Image.Image:
+    """
+    Downscale the master to its fitted size for the largest output in two cheap
+    steps: a power-of-two reduce() that keeps at least 2x headroom for the
+    filter, then a single LANCZOS pass. Smaller sizes are resized from this
+    intermediate instead of from the full-resolution master.
+    """
+    new_w, new_h = fitted_size(master.size, size)
+    factor = 1
+    while master.width >= factor * 4 * new_w and master.height >= factor * 4 * new_h:
+        factor *= 2
+    if factor > 1:
+        # Reduce in premultiplied alpha, as resize() does for RGBA
+        master = master.convert("RGBa").reduce(factor).convert("RGBA")
+    return master.resize((new_w, new_h), Image.LANCZOS)
+
+
+def quality_report(master: Image.Image, base: Image.Image) -> dict[str, tuple[int, ...]]:
+    """Maximum per-channel (R, G, B, A) difference of every render from base vs. master."""
+    targets = [(name, max(OUTPUTS[name])) for name in OUTPUTS]
+    targets += [(f"{ICO_FILENAME}@{s[0]}", s[0]) for s in ICO_SIZES]
+    report = {}
+    for name, size in targets:
+        fit = fit_maskable if name in MASKABLE_OUTPUTS else fit_square
+        diff = ImageChops.difference(fit(master, size), fit(base, size))
+        report[name] = tuple(high for _, high in diff.getextrema())
+    return report
+
+
+def make_square(image: Image.Image, size: int) -> Image.Image:
+    """
+    Fit the source image into a square canvas while preserving aspect ratio.
+    Trims background and borders first, then applies padding (currently 0%).
+    Prefer prepare_master() + fit_square() when rendering several sizes.
+    """
+    return fit_square(prepare_master(image), size)
+
+
+class EncodedPng(NamedTuple):
+    data: bytes
+    original_size: int  # bytes of the plain save(format="PNG")
+    method: str
+
+
+def encode_png(image: Image.Image, **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", **params)
+    return buffer.getvalue()
+
+
+def quantization_error(image: Image.Image, quantized: Image.Image) -> float:
+    """
+    RMS difference over all channels after premultiplying alpha, so color
+    changes under fully transparent pixels do not count.
+    """
+    diff = ImageChops.difference(image.convert("RGBa"), quantized.convert("RGBA").convert("RGBa"))
+    channels = ImageStat.Stat(diff).rms
+    return (sum(value * value for value in channels) / len(channels)) ** 0.5
+
+
+def png_encodings(image: Image.Image, effort: int = PNG_EFFORT) -> list[tuple[int, int]]:
+    """
+    (compress_level, strategy) pairs from PNG_ENCODINGS worth trying for image:
+    in order, each one whose estimated cost still fits effort. The first one
+    is always included.
+    """
+    raw = image.width * image.height * len(image.getbands())
+    chosen, spent = [], 0
+    for level, strategy, cost in PNG_ENCODINGS:
+        if chosen and spent + raw * cost > effort:
+            continue
+        chosen.append((level, strategy))
+        spent += raw * cost
+    return chosen
+
+
+def optimize_png(
+    image: Image.Image,
+    budget: float | None = None,
+    max_error: float = PNG_MAX_ERROR,
+) -> EncodedPng:
+    """
+    Smallest PNG encoding of image. Candidates are the image itself and, when
+    its quantization error is at most max_error (0 = only if lossless), a
+    256-color palette version, each encoded with the settings png_encodings()
+    picks for it. The plain encoding is always the fallback. budget 0 disables
+    the search; a positive budget stops it after that many seconds, which makes
+    the result depend on machine speed, so it is off (None) by default.
+    """
+    started = time.perf_counter()
+    baseline = encode_png(image)
+    best, method = baseline, "plain"
+    if budget is not None and budget <= 0:
+        return EncodedPng(best, len(baseline), method)
+
+    candidates = []
+    # getcolors() is cheap and exact: with at most 256 colors the palette is lossless
+    if image.mode == "RGBA" and (max_error > 0 or image.getcolors(256) is not None):
+        quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+        error = quantization_error(image, quantized)
+        if error <= max_error:
+            label = "palette" if error == 0 else f"palette(rms={error:.2f})"
+            candidates.append((label, quantized))
+    candidates.append(("truecolor", image))
+
+    for label, candidate in candidates:
+        for level, strategy in png_encodings(candidate):
+            if budget is not None and time.perf_counter() - started > budget:
+                return EncodedPng(best, len(baseline), method)
+            data = encode_png(candidate, compress_level=level, compress_type=strategy)
+            if len(data) < len(best):
+                best, method = data, f"{label} level={level} strategy={strategy}"
+    return EncodedPng(best, len(baseline), method)
+
+
+def available_formats() -> list[str]:
+    """Formats from MODERN_FORMATS that the local Pillow build can encode."""
+    return [fmt for fmt in MODERN_FORMATS if features.check(fmt)]
+
+
+def variant_names(formats: list[str]) -> dict[str, tuple[str, str]]:
+    """Modern-format output name -> (PNG name in OUTPUTS, format)."""
+    return {
+        str(Path(name).with_suffix(f".{fmt}")): (name, fmt)
+        for name in OUTPUTS
+        for fmt in formats
+    }
+
+
+def encode_variant(image: Image.Image, fmt: str) -> bytes:
+    pil_format, _, options = MODERN_FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+class RenderJob(NamedTuple):
+    size: int
+    maskable: bool
+    formats: tuple[str, ...]  # modern formats to encode besides PNG
+
+
+class RenderedIcon(NamedTuple):
+    png: EncodedPng
+    variants: dict[str, bytes]
+
 
+def render_icon(
+    master: Image.Image,
+    job: RenderJob,
+    budget: float | None = 0,
+    max_error: float = PNG_MAX_ERROR,
+) -> RenderedIcon:
+    """Render one job once and encode it as PNG plus every requested modern format."""
+    image = fit_maskable(master, job.size) if job.maskable else fit_square(master, job.size)
+    png = optimize_png(image, budget, max_error)
+    return RenderedIcon(png, {fmt: encode_variant(image, fmt) for fmt in job.formats})
 
-def save_ico(src: Image.Image, project_root: Path) -> None:
-    sizes_imgs = [make_square(src, s[0]) for s in ICO_SIZES]
-    ico_path = project_root / "favicon.ico"
-    sizes = [img.size for img in sizes_imgs]
-    sizes_imgs[0].save(ico_path, format="ICO", sizes=sizes)
-    print(f"Wrote {ico_path} (sizes: {sizes})")
+
+# Set once per worker process so the master is pickled per worker, not per task
+_worker_master: Image.Image | None = None
+_worker_png_options: tuple[float | None, float] = (0, PNG_MAX_ERROR)
+
+
+def _init_worker(master: Image.Image, png_options: tuple[float | None, float]) -> None:
+    global _worker_master, _worker_png_options
+    _worker_master = master
+    _worker_png_options = png_options
+
+
+def _render_icon_in_worker(job: RenderJob) -> RenderedIcon:
+    return render_icon(_worker_master, job, *_worker_png_options)
+
+
+def png_dimensions(data: bytes) -> tuple[int, int]:
+    """Width and height from the IHDR chunk of PNG bytes."""
+    return struct.unpack(">II", data[16:24])
+
+
+def encode_ico(frames: list[bytes]) -> bytes:
+    """
+    Pack already encoded PNG frames into an ICO container without re-encoding.
+    Every entry is stored as PNG (supported since Windows Vista and by all
+    browsers), so each size is its own full-quality render.
+    """
+    header = struct.pack("<HHH", 0, 1, len(frames))
+    offset = len(header) + 16 * len(frames)
+    entries = []
+    for data in frames:
+        width, height = png_dimensions(data)
+        # 0 means 256 px in the one-byte size fields
+        entries.append(struct.pack("<BBBBHHII", width % 256, height % 256, 0, 0, 1, 32, len(data), offset))
+        offset += len(data)
+    return b"".join([header, *entries, *frames])
+
+
+def output_names(formats: list[str] | None = None) -> list[str]:
+    formats = available_formats() if formats is None else formats
+    return [*OUTPUTS, *variant_names(formats), ICO_FILENAME]
+
+
+def render_all(
+    master: Image.Image,
+    jobs: int = 1,
+    use_processes: bool = False,
+    names: list[str] | None = None,
+    png_budget: float | None = 0,
+    png_max_error: float = PNG_MAX_ERROR,
+    report: dict[str, tuple[int, int, str]] | None = None,
+    formats: list[str] | None = None,
+) -> dict[str, bytes]:
+    """
+    Render the requested outputs (default: all) to encoded bytes keyed by
+    filename. Each distinct (size, maskable) job is rendered once, encoded as
+    PNG (optimized unless png_budget is 0, see optimize_png) and in the
+    modern formats whose variants are requested; outputs of the same size and
+    the ICO frames reuse those bytes. Variants that are not smaller than their
+    PNG are left out of the result. If report is given, it is filled with
+    (original bytes, final bytes, method) per PNG and ICO output. With jobs > 1
+    the render jobs run on a thread pool (Pillow releases the GIL while
+    resampling) or a process pool. Results come back in job order, so output
+    bytes do not depend on worker count.
+    """
+    formats = available_formats() if formats is None else formats
+    names = output_names(formats) if names is None else names
+    variants = {v: src for v, src in variant_names(formats).items() if v in names}
+    png_names = [n for n in OUTPUTS if n in names]
+
+    def job_key(name: str) -> tuple[int, bool]:
+        return max(OUTPUTS[name]), name in MASKABLE_OUTPUTS
+
+    wanted: dict[tuple[int, bool], set[str]] = {}
+    for name in png_names:
+        wanted.setdefault(job_key(name), set())
+    for base, fmt in variants.values():
+        wanted.setdefault(job_key(base), set()).add(fmt)
+    if ICO_FILENAME in names:
+        for s in ICO_SIZES:
+            wanted.setdefault((s[0], False), set())
+    render_jobs = [
+        RenderJob(size, maskable, tuple(fmt for fmt in formats if fmt in fmts))
+        for (size, maskable), fmts in wanted.items()
+    ]
+
+    png_options = (png_budget, png_max_error)
+    if jobs <= 1:
+        results = [render_icon(master, job, *png_options) for job in render_jobs]
+    elif use_processes:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(master, png_options)
+        ) as pool:
+            results = list(pool.map(_render_icon_in_worker, render_jobs))
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(lambda job: render_icon(master, job, *png_options), render_jobs))
+
+    by_key = {(job.size, job.maskable): result for job, result in zip(render_jobs, results)}
+    rendered = {name: by_key[job_key(name)].png.data for name in png_names}
+    for name, (base, fmt) in variants.items():
+        # A variant that is not smaller than its PNG would only add bytes to ship
+        result = by_key[job_key(base)]
+        if len(result.variants[fmt]) < len(result.png.data):
+            rendered[name] = result.variants[fmt]
+    if report is not None:
+        for name in png_names:
+            encoded = by_key[job_key(name)].png
+            report[name] = (encoded.original_size, len(encoded.data), encoded.method)
+    if ICO_FILENAME in names:
+        frames = [by_key[(s[0], False)].png for s in ICO_SIZES]
+        rendered[ICO_FILENAME] = encode_ico([frame.data for frame in frames])
+        if report is not None:
+            # Same container layout: 6-byte header plus a 16-byte entry per frame
+            original = 6 + sum(16 + frame.original_size for frame in frames)
+            report[ICO_FILENAME] = (original, len(rendered[ICO_FILENAME]), "frames")
+    return rendered
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_settings(
+    source_path: Path,
+    resample: str = "direct",
+    png_budget: float | None = 0,
+    png_max_error: float = PNG_MAX_ERROR,
+    formats: list[str] | None = None,
+    memory_limit: int | None = None,
+) -> dict:
+    """Everything that influences the output bytes, in JSON-comparable form."""
+    return {
+        "version": MANIFEST_VERSION,
+        "source": source_path.name,
+        "source_sha256": digest(source_path.read_bytes()),
+        "padding_ratio": PADDING_RATIO,
+        "background_tolerance": BACKGROUND_TOLERANCE,
+        "border_tolerance": BORDER_TOLERANCE,
+        "resample": resample,
+        "memory_limit": memory_limit,
+        "png_budget": png_budget,
+        "png_max_error": png_max_error,
+        "png_encodings": [list(encoding) for encoding in PNG_ENCODINGS],
+        "png_effort": PNG_EFFORT,
+        "formats": available_formats() if formats is None else formats,
+        "modern_formats": {fmt: MODERN_FORMATS[fmt][2] for fmt in MODERN_FORMATS},
+        "maskable": {
+            "outputs": sorted(MASKABLE_OUTPUTS),
+            "safe_zone": MASKABLE_SAFE_ZONE,
+            "background": list(MASKABLE_BACKGROUND),
+        },
+        "outputs": {name: list(size) for name, size in OUTPUTS.items()},
+        "ico_sizes": [list(size) for size in ICO_SIZES],
+    }
+
+
+def load_manifest(project_root: Path) -> dict:
+    try:
+        return json.loads((project_root / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(project_root: Path, settings: dict, hashes: dict[str, str | None]) -> None:
+    manifest = {"settings": settings, "outputs": hashes}
+    text = json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+    (project_root / MANIFEST_FILENAME).write_text(text, encoding="utf-8")
+
+
+def stale_outputs(manifest: dict, settings: dict, project_root: Path) -> list[str]:
+    """
+    Outputs that must be re-rendered: all of them if any setting changed since
+    the last run, otherwise only those missing on disk or edited by hand.
+    """
+    names = output_names(settings["formats"])
+    if manifest.get("settings") != settings:
+        return names
+    recorded = manifest.get("outputs", {})
+    stale = []
+    for name in names:
+        path = project_root / name
+        if name in recorded and recorded[name] is None:
+            # Recorded as skipped (see build_icons): up to date while absent
+            if path.exists():
+                stale.append(name)
+        elif not path.exists() or digest(path.read_bytes()) != recorded.get(name):
+            stale.append(name)
+    return stale
+
+
+def write_outputs(rendered: dict[str, bytes], project_root: Path) -> int:
+    """Write rendered outputs whose bytes differ from the file on disk; returns how many were written."""
+    written = 0
+    for name, data in rendered.items():
+        out_path = project_root / name
+        if out_path.exists() and out_path.read_bytes() == data:
+            continue
+        out_path.write_bytes(data)
+        written += 1
+        if name == ICO_FILENAME:
+            print(f"Wrote {out_path} (sizes: {ICO_SIZES})")
+        else:
+            w, h = OUTPUTS[str(Path(name).with_suffix(".png"))]
+            print(f"Wrote {out_path} ({w}x{h})")
+    return written
+
+
+def manifest_icons(icons: list[dict], formats: list[str], project_root: Path) -> list[dict]:
+    """
+    Rebuild a web manifest "icons" list for the PNGs it already references
+    (default: the 192/512 and maskable icons). The src prefix is kept from the
+    first existing entry; if it used a query (?v=7), every src gets ?v= with
+    a hash of the file's bytes, so browsers refetch exactly the icons that
+    changed. Modern variants are listed before the PNG of the same size,
+    smallest first, and only when they are smaller than that PNG; they share
+    the purpose of the PNG's existing entry.
+    """
+    prefix, versioned = "./", False
+    purposes = {}
+    for icon in icons:
+        path, _, icon_query = icon.get("src", "").partition("?")
+        name = path.rsplit("/", 1)[-1]
+        if name in OUTPUTS and name not in purposes:
+            if not purposes:
+                prefix, versioned = path[: len(path) - len(name)], bool(icon_query)
+            purposes[name] = icon.get("purpose")
+    if not purposes:
+        purposes = {"android-chrome-192x192.png": None, "android-chrome-512x512.png": None}
+        purposes.update(dict.fromkeys(sorted(MASKABLE_OUTPUTS), "maskable"))
+
+    entries = []
+    for name, purpose in purposes.items():
+        w, h = OUTPUTS[name]
+        png_size = (project_root / name).stat().st_size
+        candidates = []
+        for fmt in formats:
+            variant = str(Path(name).with_suffix(f".{fmt}"))
+            path = project_root / variant
+            if not path.exists() or path.stat().st_size >= png_size:
+                continue
+            candidates.append((path.stat().st_size, variant, MODERN_FORMATS[fmt][1]))
+        candidates.sort()
+        candidates.append((png_size, name, "image/png"))
+        for _, filename, mime in candidates:
+            query = f"?v={digest((project_root / filename).read_bytes())[:8]}" if versioned else ""
+            entry = {"src": f"{prefix}{filename}{query}", "sizes": f"{w}x{h}", "type": mime}
+            if purpose:
+                entry["purpose"] = purpose
+            entries.append(entry)
+    return entries
+
+
+def replace_icons(text: str, icons: list[dict]) -> str:
+    """
+    Replace the "icons" array of the manifest JSON text, leaving every other
+    byte alone. Entries keep the layout of the existing first entry: one
+    line each ({ "src": ... }) or indented blocks.
+    """
+    start = text.find("[", text.index('"icons"'))
+    _, end = json.JSONDecoder().raw_decode(text, start)
+    line = text[text.rfind("\n", 0, start) + 1:]
+    indent = line[: len(line) - len(line.lstrip())]
+    body = text[start + 1:end].lstrip()
+    compact = body.startswith("{") and "\n" not in body[: body.find("}")]
+    inner = indent + "  "
+    if compact:
+        lines = [f"{inner}{{ {json.dumps(icon, ensure_ascii=False)[1:-1]} }}" for icon in icons]
+    else:
+        lines = [
+            inner + json.dumps(icon, indent=2, ensure_ascii=False).replace("\n", "\n" + inner)
+            for icon in icons
+        ]
+    return text[:start] + "[\n" + ",\n".join(lines) + "\n" + indent + "]" + text[end:]
+
+
+def update_web_manifests(project_root: Path, formats: list[str]) -> int:
+    """Regenerate the icons of every existing WEB_MANIFESTS file; returns how many changed."""
+    changed = 0
+    for filename in WEB_MANIFESTS:
+        path = project_root / filename
+        if not path.exists():
+            continue
+        original = path.read_text(encoding="utf-8")
+        data = json.loads(original)
+        icons = manifest_icons(data.get("icons", []), formats, project_root)
+        if "icons" in data:
+            text = replace_icons(original, icons)
+        else:
+            data["icons"] = icons
+            text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+        if text != original:
+            path.write_text(text, encoding="utf-8")
+            print(f"Updated icons in {path}")
+            changed += 1
+    return changed
+
+
+def print_size_report(report: dict[str, tuple[int, int, str]]) -> None:
+    """Bytes saved per asset by optimize_png and in total."""
+    for name, (original, final, method) in report.items():
+        saved = original - final
+        percent = 100 * saved / original if original else 0
+        print(f"{name}: {original} -> {final} bytes (saved {saved}, {percent:.1f}%) [{method}]")
+    original = sum(entry[0] for entry in report.values())
+    final = sum(entry[1] for entry in report.values())
+    print(f"PNG optimization saved {original - final} of {original} bytes")
 
 
 def resolve_source(root: Path, cli_arg: str | None) -> Path:
@@ -181,19 +835,272 @@ def resolve_source(root: Path, cli_arg: str | None) -> Path:
     return fallback
 
 
-def main() -> int:
+class BuildOptions(NamedTuple):
+    jobs: int = 1
+    use_processes: bool = False
+    resample: str = "direct"
+    png_budget: float | None = None  # seconds; None = no limit, 0 = no optimization
+    png_max_error: float = PNG_MAX_ERROR
+    memory_limit: int | None = None  # bytes
+    force: bool = False
+
+
+def build_icons(source_path: Path, out_dir: Path, options: BuildOptions) -> tuple[int, int]:
+    """
+    Render every stale output for source_path into out_dir, which holds its own
+    incremental-build manifest and web manifests. Returns (built, skipped).
+    """
+    largest = max(max(size) for size in [*OUTPUTS.values(), *ICO_SIZES])
+    formats = available_formats()
+    settings = build_settings(
+        source_path, options.resample, options.png_budget, options.png_max_error,
+        formats, options.memory_limit,
+    )
+    manifest = {} if options.force else load_manifest(out_dir)
+    stale = stale_outputs(manifest, settings, out_dir)
+    hashes = dict(manifest.get("outputs", {})) if manifest.get("settings") == settings else {}
+
+    built = 0
+    if stale:
+        if options.memory_limit:
+            src = load_source_bounded(source_path, options.memory_limit, largest)
+            master = prepare_master(src, strip_rows(src.width, options.memory_limit))
+        else:
+            src = load_source_image(source_path)
+            master = prepare_master(src)
+        del src
+        if options.resample == "progressive":
+            master = progressive_base(master, largest)
+        report = {}
+        rendered = render_all(
+            master, jobs=options.jobs, use_processes=options.use_processes, names=stale,
+            png_budget=options.png_budget, png_max_error=options.png_max_error, report=report,
+            formats=formats,
+        )
+        built = write_outputs(rendered, out_dir)
+        for name in stale:
+            if name not in rendered:
+                skipped_path = out_dir / name
+                if skipped_path.exists():
+                    skipped_path.unlink()
+                print(f"Skipped {skipped_path}: not smaller than {Path(name).with_suffix('.png').name}")
+                hashes[name] = None
+        if options.png_budget != 0:
+            print_size_report(report)
+        hashes.update({name: digest(data) for name, data in rendered.items()})
+    save_manifest(out_dir, settings, hashes)
+    update_web_manifests(out_dir, formats)
+    return built, len(output_names(formats)) - built
+
+
+class BrandJob(NamedTuple):
+    name: str
+    source: Path
+    output: Path
+
+
+class BrandResult(NamedTuple):
+    name: str
+    built: int
+    skipped: int
+    size: int  # bytes of all outputs in the brand's directory
+    seconds: float
+    error: str | None
+    log: str
+
+
+def load_batch(path: Path, out_root: Path) -> list[BrandJob]:
+    """
+    Brands from a directory (every image in it, output to out_root/<stem>) or
+    from a JSON manifest: a list, or {"brands": [...]}, of entries with
+    "source" and optional "name" and "output", relative to the manifest.
+    Names and output directories must be unique so builds stay isolated.
+    """
+    if path.is_dir():
+        jobs = [
+            BrandJob(p.stem, p, out_root / p.stem)
+            for p in sorted(path.iterdir())
+            if p.suffix.lower() in BATCH_IMAGE_SUFFIXES
+        ]
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        entries = data["brands"] if isinstance(data, dict) else data
+        jobs = []
+        for entry in entries:
+            source = path.parent / entry["source"]
+            name = entry.get("name", source.stem)
+            output = path.parent / entry["output"] if "output" in entry else out_root / name
+            jobs.append(BrandJob(name, source, output))
+    for field in ("name", "output"):
+        values = [getattr(job, field) for job in jobs]
+        duplicates = sorted({str(v) for v in values if values.count(v) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate brand {field}s in {path}: {', '.join(duplicates)}")
+    return jobs
+
+
+def build_brand(job: BrandJob, options: BuildOptions) -> BrandResult:
+    """Build one brand with its output captured, so a pool worker's failure stays per brand."""
+    log = io.StringIO()
+    start = time.perf_counter()
+    built = skipped = 0
+    error = None
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            if not job.source.exists():
+                raise FileNotFoundError(f"Source image not found: {job.source}")
+            job.output.mkdir(parents=True, exist_ok=True)
+            built, skipped = build_icons(job.source, job.output, options)
+    except Exception as exc:  # reported in the summary instead of stopping the batch
+        error = f"{type(exc).__name__}: {exc}"
+    seconds = time.perf_counter() - start
+    size = sum(
+        path.stat().st_size
+        for path in (job.output / name for name in output_names())
+        if path.exists()
+    )
+    return BrandResult(job.name, built, skipped, size, seconds, error, log.getvalue())
+
+
+def run_batch(jobs: list[BrandJob], options: BuildOptions, workers: int) -> list[BrandResult]:
+    """
+    Build all brands on a process pool; each worker pays interpreter and
+    Pillow startup once and then takes brand after brand. Every brand renders
+    single-threaded so the pool does not oversubscribe the cores.
+    """
+    options = options._replace(jobs=1, use_processes=False)
+    if workers <= 1 or len(jobs) <= 1:
+        return [build_brand(job, options) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [pool.submit(build_brand, job, options) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def print_batch_summary(results: list[BrandResult], elapsed: float) -> None:
+    width = max([len("brand"), *(len(result.name) for result in results)])
+    print(f"{'brand':<{width}}  {'status':<6}  {'built':>5}  {'skipped':>7}  {'KB':>8}  {'seconds':>7}")
+    for result in results:
+        status = "error" if result.error else "ok"
+        print(
+            f"{result.name:<{width}}  {status:<6}  {result.built:>5}  {result.skipped:>7}  "
+            f"{result.size / 1024:>8.1f}  {result.seconds:>7.2f}"
+        )
+    serial = sum(result.seconds for result in results)
+    print(
+        f"{len(results)} brands in {elapsed:.2f} s wall "
+        f"({serial:.2f} s of brand time, {serial / elapsed if elapsed else 0:.1f}x parallel)"
+    )
+    for result in results:
+        if result.error:
+            print(f"\n{result.name}: {result.error}\n{result.log}", end="")
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate favicon and PWA icon assets.")
+    parser.add_argument("source", nargs="?", help="source image relative to the project root")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=os.cpu_count() or 1,
+        help="number of parallel render workers (default: all cores)",
+    )
+    parser.add_argument(
+        "--processes", action="store_true",
+        help="render on a process pool instead of a thread pool",
+    )
+    parser.add_argument(
+        "--resample", choices=RESAMPLE_MODES, default="direct",
+        help="progressive: downscale once to the largest size, then render the rest from it",
+    )
+    parser.add_argument(
+        "--quality-check", action="store_true",
+        help="print the max per-channel difference of progressive vs. direct renders and exit",
+    )
+    parser.add_argument(
+        "--png-budget", type=float, metavar="SECONDS",
+        help="optional time limit per PNG for size optimization; the result then depends on "
+        "machine speed (default: no limit, same bytes everywhere; 0 disables optimization)",
+    )
+    parser.add_argument(
+        "--png-max-error", type=float, default=PNG_MAX_ERROR, metavar="RMS",
+        help="largest quantization error accepted for lossy palette PNGs "
+        f"(default: {PNG_MAX_ERROR:g}, lossless only; 3 is barely visible at icon sizes)",
+    )
+    parser.add_argument(
+        "--memory-limit", type=positive_int, metavar="MB",
+        help="bound memory for large masters: process masks in strips and, for JPEG masters only, "
+        "downscale while decoding; other formats (PNG) are still decoded in full first",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help=f"ignore {MANIFEST_FILENAME} and re-render every output",
+    )
+    parser.add_argument(
+        "--batch", metavar="PATH",
+        help="build many brands: a directory of source images or a JSON manifest (see load_batch); "
+        "--jobs sets the number of brand worker processes",
+    )
+    parser.add_argument(
+        "--out-root", default=BATCH_OUTPUT_ROOT, metavar="DIR",
+        help=f"batch output root; each brand gets DIR/<name> (default: {BATCH_OUTPUT_ROOT})",
+    )
+    return parser.parse_args(argv)
+
+
+def print_peak_rss(workers: bool) -> None:
+    peak = peak_rss_mb()
+    if peak is not None:
+        own, children = peak
+        print(f"Peak RSS: {own:.1f} MB" + (f" (worker processes: {children:.1f} MB)" if workers else ""))
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    options = BuildOptions(
+        jobs=args.jobs,
+        use_processes=args.processes,
+        resample=args.resample,
+        png_budget=args.png_budget,
+        png_max_error=args.png_max_error,
+        memory_limit=args.memory_limit * 2**20 if args.memory_limit else None,
+        force=args.force,
+    )
+    if args.batch:
+        try:
+            jobs = load_batch(Path(args.batch), Path(args.out_root))
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"Cannot read batch {args.batch}: {exc}")
+            return 1
+        start = time.perf_counter()
+        results = run_batch(jobs, options, args.jobs)
+        print_batch_summary(results, time.perf_counter() - start)
+        print_peak_rss(workers=True)
+        return 1 if any(result.error for result in results) else 0
+
     root = Path(__file__).resolve().parent
-    cli_source = sys.argv[1] if len(sys.argv) > 1 else None
-    source_path = resolve_source(root, cli_source)
+    source_path = resolve_source(root, args.source)
     if not source_path.exists():
         print(f"Source image not found: {source_path}")
         return 1
 
     print(f"Using source: {source_path.name}")
-    src = load_source_image(source_path)
-    save_pngs(src, root)
-    save_ico(src, root)
-    print("All favicon assets generated.")
+    largest = max(max(size) for size in [*OUTPUTS.values(), *ICO_SIZES])
+    if args.quality_check:
+        master = prepare_master(load_source_image(source_path))
+        report = quality_report(master, progressive_base(master, largest))
+        for name, channels in report.items():
+            print(f"{name}: max diff R={channels[0]} G={channels[1]} B={channels[2]} A={channels[3]}")
+        print(f"Overall max per-channel difference: {max(max(c) for c in report.values())}")
+        return 0
+
+    built, skipped = build_icons(source_path, root, options)
+    print(f"All favicon assets generated: {built} built, {skipped} skipped.")
+    print_peak_rss(workers=args.processes)
     return 0
 
 
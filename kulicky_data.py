@@ -4,6 +4,8 @@
 Kompletní data kuliček pro lekce 0-14 z KOULIO dokumentu.
 """
 
+import sys
+
 kulicky_data = {
     0: {  # Úvodní lekce
         "kulicky": [
@@ -1054,9 +1056,236 @@ kulicky_data = {
     }
 }
 
+
+def content_crc(data):
+    """crc32 dat ve tvaru kulicky_data; stejná data dají stejné číslo."""
+    import zlib
+
+    crc = 0
+    for lesson_num, entry in sorted(data.items()):
+        texts = entry.get("kulicky", [])
+        crc = zlib.crc32(f"{lesson_num}:{len(texts)}\n".encode("ascii"), crc)
+        for text in texts:
+            crc = zlib.crc32(text.encode("utf-8") + b"\n", crc)
+    return crc
+
+
+# Názvy lekcí (odpovídají komentářům v kulicky_data výše)
+lesson_titles = {
+    0: "Úvodní lekce",
+    1: "Emoční prožitky",
+    2: "Vztah k sobě",
+    3: "Závislosti",
+    4: "Skutečné bohatství",
+    5: "Rodinné vztahy",
+    6: "Prenatální období",
+    7: "Škola a dospívání",
+    8: "Vztah muž a žena",
+    9: "Přijetí těla",
+    10: "Sexualita",
+    11: "Profesní život",
+    12: "Společný život",
+    13: "Těhotenství",
+    14: "Obecné pravdy",
+}
+
+def normalize(text):
+    """Malá písmena bez diakritiky: "Peníze" -> "penize"."""
+    import unicodedata
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+# normalize() textů kuliček; sdílená cache, aby instance Kulicka zůstaly neměnné
+_normalized_texts = {}
+
+class Kulicka:
+    """
+    Jedna kulička katalogu. Instance vytváří jen KulickyCatalog a sdílí je
+    mezi všemi požadavky, proto jsou neměnné: přiřazení atributu vyhodí
+    AttributeError. Text je internovaný a normalizovaný text se spočítá až
+    při prvním použití (cache je mimo instanci).
+    """
+
+    __slots__ = ("lesson", "index", "id", "text")
+
+    def __init__(self, lesson, index, item_id, text):
+        object.__setattr__(self, "lesson", lesson)
+        object.__setattr__(self, "index", index)
+        object.__setattr__(self, "id", item_id)
+        object.__setattr__(self, "text", sys.intern(text))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Kulicka je neměnná, nelze nastavit {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Kulicka je neměnná, nelze smazat {name!r}")
+
+    @property
+    def normalized(self):
+        normalized = _normalized_texts.get(self.text)
+        if normalized is None:
+            normalized = _normalized_texts[self.text] = sys.intern(normalize(self.text))
+        return normalized
+
+    def as_dict(self):
+        """Tvar, jaký vrací API backendu."""
+        return {"id": self.id, "text": self.text, "order_index": self.index, "lesson": self.lesson}
+
+    def __repr__(self):
+        return f"Kulicka(lesson={self.lesson}, index={self.index}, id={self.id!r}, text={self.text!r})"
+
+class KulickyCatalog:
+    """
+    Indexovaný, neměnný pohled na kulicky_data.
+
+    Nabízí O(1) vyhledání textu (lekce, pozice), stabilní ID položek, počty
+    na lekci a n-tice místo sdílených seznamů. Texty, záznamy a ID lekce se
+    sestaví při prvním přístupu k lekci; indexy přes celý katalog (by_id,
+    positions) až při prvním dotazu na ně.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        sizes = {n: len(entry.get("kulicky", [])) for n, entry in sorted(data.items())}
+        self._counts = sizes
+        self._total = sum(sizes.values())
+        self._lessons = {}
+        self._records = {}
+        self._ids = {}
+        self._by_id = None
+        self._positions = None
+        self._version = None
+
+    @property
+    def version(self):
+        """Hash obsahu katalogu (8 hex znaků); mění se s každou úpravou dat."""
+        if self._version is None:
+            self._version = f"{content_crc(self._data):08x}"
+        return self._version
+
+    def _texts(self, lesson_num):
+        texts = self._lessons.get(lesson_num)
+        if texts is None:
+            if lesson_num not in self._counts:
+                return ()
+            entry = self._data[lesson_num]
+            texts = tuple(sys.intern(text) for text in entry.get("kulicky", []))
+            self._lessons[lesson_num] = texts
+        return texts
+
+    def _lesson_records(self, lesson_num):
+        records = self._records.get(lesson_num)
+        if records is None:
+            repeats = {}
+            records = []
+            for index, text in enumerate(self._texts(lesson_num)):
+                repeat = repeats.get(text, 0)
+                repeats[text] = repeat + 1
+                records.append(Kulicka(lesson_num, index, self.make_id(lesson_num, text, repeat), text))
+            records = self._records[lesson_num] = tuple(records)
+            self._ids[lesson_num] = tuple(record.id for record in records)
+        return records
+
+    def _id_index(self):
+        if self._by_id is None:
+            self._by_id = {
+                record.id: record
+                for lesson_num in self._counts
+                for record in self._lesson_records(lesson_num)
+            }
+        return self._by_id
+
+    def _position_index(self):
+        if self._positions is None:
+            positions = {}
+            for lesson_num, index, text in self:
+                positions.setdefault(text, []).append((lesson_num, index))
+            self._positions = {text: tuple(pos) for text, pos in positions.items()}
+        return self._positions
+
+    @staticmethod
+    def make_id(lesson_num, text, repeat=0):
+        """
+        Stabilní ID kuličky: lekce + hash textu. Nemění se při přeřazení ani při
+        úpravě jiných položek; opakovaný text v téže lekci dostane příponu.
+        """
+        import hashlib  # až tady: OpenSSL je nejdražší část importu modulu
+
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+        item_id = f"{lesson_num:02d}-{digest}"
+        return f"{item_id}~{repeat}" if repeat else item_id
+
+    def lessons(self):
+        """Čísla lekcí ve vzestupném pořadí."""
+        return tuple(self._counts)
+
+    def lesson(self, lesson_num):
+        """Kuličky lekce jako n-tice (prázdná pro neznámou lekci)."""
+        return self._texts(lesson_num)
+
+    def count(self, lesson_num):
+        return self._counts.get(lesson_num, 0)
+
+    @property
+    def counts(self):
+        """Počty kuliček na lekci (jen pro čtení)."""
+        from types import MappingProxyType
+
+        return MappingProxyType(self._counts)
+
+    def ids(self, lesson_num):
+        """Stabilní ID kuliček lekce ve stejném pořadí jako lesson()."""
+        self._lesson_records(lesson_num)
+        return self._ids.get(lesson_num, ())
+
+    def item_id(self, lesson_num, index):
+        return self.record(lesson_num, index).id
+
+    def by_id(self, item_id):
+        """Vrátí (lekce, pozice, text) pro ID, nebo None."""
+        record = self._id_index().get(item_id)
+        return (record.lesson, record.index, record.text) if record else None
+
+    def records(self, lesson_num):
+        """Sdílené instance Kulicka pro lekci (prázdná n-tice pro neznámou lekci)."""
+        return self._lesson_records(lesson_num)
+
+    def record(self, lesson_num, index):
+        if lesson_num not in self._counts:
+            raise KeyError(lesson_num)
+        return self._lesson_records(lesson_num)[index]
+
+    def get(self, item_id):
+        """Kulicka podle stabilního ID, nebo None."""
+        return self._id_index().get(item_id)
+
+    def locate(self, text):
+        """Vrátí (lekce, pozice) prvního výskytu textu, nebo None."""
+        positions = self._position_index().get(text)
+        return positions[0] if positions else None
+
+    def positions(self, text):
+        """Všechny výskyty textu jako n-tice (lekce, pozice)."""
+        return self._position_index().get(text, ())
+
+    def __contains__(self, text):
+        return text in self._position_index()
+
+    def __len__(self):
+        return self._total
+
+    def __iter__(self):
+        """Prochází (lekce, pozice, text) v pořadí lekcí."""
+        for lesson_num in self._counts:
+            for index, text in enumerate(self._texts(lesson_num)):
+                yield lesson_num, index, text
+
+catalog = KulickyCatalog(kulicky_data)
+
 def get_kulicky_for_lesson(lesson_num):
     """Vrátí kuličky pro danou lekci."""
-    return kulicky_data.get(lesson_num, {}).get("kulicky", [])
+    return list(catalog.lesson(lesson_num))
 
 if __name__ == "__main__":
     for lesson_num in range(0, 15):
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nahrání katalogu kuliček do Postgres tabulky kulicky (lesson_id, text, order_index),
+ze které čte backend (backend/src/routes/kulicky.js).
+
+Všechny lekce jdou jedním COPY ... FROM STDIN (CSV nebo binární formát)
+v jedné transakci, místo jednoho INSERTu na kuličku:
+
+    python kulicky_db.py load                     # všechny lekce, CSV
+    python kulicky_db.py load --lessons 4 5 --replace --format binary
+
+Po úpravě kulicky_data.py stačí místo znovunahrání synchronizace, která
+použije jen nutné INSERTy, UPDATE textu a přeřazení (id řádků, a tedy i
+user_kulicky_state, zůstávají):
+
+    python kulicky_db.py sync --dry-run           # jen vypsat plán
+    python kulicky_db.py sync [--prune]           # provést (--prune i mazání)
+
+Připojení se bere z --dsn, DATABASE_URL nebo DB_HOST/DB_PORT/DB_NAME/DB_USER/
+DB_PASSWORD se stejnými výchozími hodnotami jako backend. Potřebuje psycopg
+(3) nebo psycopg2. order_index je pozice kuličky v lekci (od 0).
+"""
+
+import argparse
+import csv
+import io
+import os
+import struct
+import time
+from typing import NamedTuple
+
+from kulicky_data import catalog
+
+TABLE = "kulicky"
+COLUMNS = ("lesson_id", "text", "order_index")
+COPY_FORMATS = ("csv", "binary")
+CHANGE_KINDS = ("insert", "update", "reorder", "delete")
+
+# Velikost bloků, po kterých se data posílají do COPY
+_CHUNK_SIZE = 64 * 1024
+
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
+
+
+def connect(dsn=None):
+    """Otevře spojení přes psycopg (3), případně psycopg2."""
+    dsn = dsn or os.environ.get("DATABASE_URL") or _dsn_from_env()
+    try:
+        import psycopg
+    except ImportError:
+        try:
+            import psycopg2 as psycopg
+        except ImportError:
+            raise SystemExit("Chybí ovladač Postgres: pip install psycopg[binary]") from None
+    return psycopg.connect(dsn)
+
+
+def _dsn_from_env():
+    parts = {
+        "host": os.environ.get("DB_HOST", "localhost"),
+        "port": os.environ.get("DB_PORT", "5432"),
+        "dbname": os.environ.get("DB_NAME", "unroll_db"),
+        "user": os.environ.get("DB_USER", "unroll_user"),
+        "password": os.environ.get("DB_PASSWORD"),
+    }
+    return " ".join(f"{key}={value}" for key, value in parts.items() if value)
+
+
+def iter_rows(lessons=None):
+    """(lesson_id, text, order_index) pro vybrané lekce (výchozí: všechny)."""
+    wanted = catalog.lessons() if lessons is None else lessons
+    for lesson_num in wanted:
+        for index, text in enumerate(catalog.lesson(lesson_num)):
+            yield lesson_num, text, index
+
+
+def _chunked(pieces):
+    """Slepí malé kusy bytes do bloků kolem _CHUNK_SIZE."""
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= _CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def csv_chunks(rows):
+    """Řádky jako CSV pro COPY ... (FORMAT csv)."""
+    text = io.StringIO()
+    # Texty vždy v uvozovkách: nechráněné prázdné pole by COPY načetlo jako NULL
+    writer = csv.writer(text, lineterminator="\n", quoting=csv.QUOTE_NONNUMERIC)
+
+    def pieces():
+        for row in rows:
+            writer.writerow(row)
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+
+    return _chunked(pieces())
+
+
+def binary_chunks(rows):
+    """Řádky v binárním formátu COPY (int4, text, int4)."""
+
+    def pieces():
+        yield _PGCOPY_HEADER
+        for lesson_num, text, index in rows:
+            encoded = text.encode("utf-8")
+            yield struct.pack("!hii", len(COLUMNS), 4, lesson_num)
+            yield struct.pack("!i", len(encoded)) + encoded
+            yield struct.pack("!ii", 4, index)
+        yield _PGCOPY_TRAILER
+
+    return _chunked(pieces())
+
+
+class _ChunkReader:
+    """Souborový objekt nad generátorem bloků pro psycopg2 copy_expert()."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._pending += chunk
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def copy_chunks(cursor, sql, chunks):
+    """Pošle bloky do COPY FROM STDIN přes psycopg 3 (cursor.copy) nebo psycopg2."""
+    if hasattr(cursor, "copy"):
+        with cursor.copy(sql) as copy:
+            for chunk in chunks:
+                copy.write(chunk)
+    else:
+        cursor.copy_expert(sql, _ChunkReader(chunks))
+
+
+def copy_sql(fmt="csv"):
+    options = "FORMAT binary" if fmt == "binary" else "FORMAT csv"
+    return f"COPY {TABLE} ({', '.join(COLUMNS)}) FROM STDIN ({options})"
+
+
+def load(conn, lessons=None, fmt="csv", replace=False):
+    """
+    Nahraje kuličky vybraných lekcí jedním COPY v jedné transakci a vrátí
+    počet řádků. S replace=True nejdřív smaže stávající řádky těchto lekcí.
+    """
+    if fmt not in COPY_FORMATS:
+        raise ValueError(f"Neznámý formát COPY: {fmt}")
+    lessons = list(catalog.lessons() if lessons is None else lessons)
+    counted = 0
+
+    def rows():
+        nonlocal counted
+        for row in iter_rows(lessons):
+            counted += 1
+            yield row
+
+    chunks = binary_chunks(rows()) if fmt == "binary" else csv_chunks(rows())
+    try:
+        cursor = conn.cursor()
+        if replace:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE lesson_id = ANY(%s)", (lessons,))
+        copy_chunks(cursor, copy_sql(fmt), chunks)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counted
+
+
+class SyncPlan(NamedTuple):
+    """Rozdíl mezi katalogem a tabulkou kulicky."""
+
+    inserts: list  # (lesson_id, text, order_index)
+    updates: list  # (id, lesson_id, text, order_index) - změněný text na místě
+    reorders: list  # (id, lesson_id, order_index)
+    deletes: list  # (id, lesson_id, order_index) - řádky, které v katalogu už nejsou
+
+    def is_empty(self):
+        return not (self.inserts or self.updates or self.reorders or self.deletes)
+
+    def summary(self):
+        """Počty změn po lekcích: {lekce: {"insert": n, ...}}."""
+        per_lesson = {}
+        # lesson_id je v inserts první, jinde druhý
+        kinds = zip(CHANGE_KINDS, self, (0, 1, 1, 1))
+        for kind, items, lesson_pos in kinds:
+            for item in items:
+                counts = per_lesson.setdefault(item[lesson_pos], dict.fromkeys(CHANGE_KINDS, 0))
+                counts[kind] += 1
+        return dict(sorted(per_lesson.items()))
+
+
+def fetch_rows(conn, lessons):
+    """Stávající řádky vybraných lekcí jako {lekce: [(id, order_index, text), ...]}."""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT id, lesson_id, order_index, text FROM {TABLE} WHERE lesson_id = ANY(%s)",
+        (list(lessons),),
+    )
+    rows = {}
+    for row_id, lesson_num, order_index, text in cursor.fetchall():
+        rows.setdefault(lesson_num, []).append((row_id, order_index, text))
+    return rows
+
+
+def _diff_lesson(lesson_num, desired, existing, plan):
+    """
+    Spáruje kuličky lekce s řádky v DB: nejdřív stejný text i pozice, pak
+    stejný text jinde (přeřazení), pak stejná pozice s jiným textem (úprava).
+    Co zbude, se vloží nebo smaže.
+    """
+    free = sorted(existing, key=lambda row: (row[1] is None, row[1] or 0))
+    pending = list(enumerate(desired))
+
+    # 1. beze změny
+    by_key = {}
+    for row in free:
+        by_key.setdefault((row[2], row[1]), []).append(row)
+    unmatched = []
+    for index, text in pending:
+        rows = by_key.get((text, index))
+        if rows:
+            free.remove(rows.pop(0))
+        else:
+            unmatched.append((index, text))
+
+    # 2. stejný text na jiné pozici
+    by_text = {}
+    for row in free:
+        by_text.setdefault(row[2], []).append(row)
+    pending, unmatched = unmatched, []
+    for index, text in pending:
+        rows = by_text.get(text)
+        if rows:
+            row = rows.pop(0)
+            free.remove(row)
+            plan.reorders.append((row[0], lesson_num, index))
+        else:
+            unmatched.append((index, text))
+
+    # 3. stejná pozice, upravený text
+    by_index = {row[1]: row for row in free}
+    for index, text in unmatched:
+        row = by_index.pop(index, None)
+        if row is not None:
+            free.remove(row)
+            plan.updates.append((row[0], lesson_num, text, index))
+        else:
+            plan.inserts.append((lesson_num, text, index))
+
+    plan.deletes.extend((row[0], lesson_num, row[1]) for row in free)
+
+
+def plan_sync(conn, lessons=None):
+    """Spočítá SyncPlan pro vybrané lekce (výchozí: všechny v katalogu)."""
+    lessons = list(catalog.lessons() if lessons is None else lessons)
+    existing = fetch_rows(conn, lessons)
+    plan = SyncPlan([], [], [], [])
+    for lesson_num in lessons:
+        _diff_lesson(lesson_num, catalog.lesson(lesson_num), existing.get(lesson_num, []), plan)
+    return plan
+
+
+def _execute_batch(cursor, sql, params):
+    """executemany; u psycopg2 přes execute_batch, aby šlo o pár round-tripů."""
+    if not params:
+        return
+    if not hasattr(cursor, "copy"):
+        try:
+            from psycopg2.extras import execute_batch
+        except ImportError:
+            pass
+        else:
+            execute_batch(cursor, sql, params)
+            return
+    cursor.executemany(sql, params)
+
+
+def apply_sync(conn, plan, prune=False):
+    """Provede plán v jedné transakci; mazání jen s prune=True."""
+    try:
+        cursor = conn.cursor()
+        if prune:
+            _execute_batch(
+                cursor, f"DELETE FROM {TABLE} WHERE id = %s", [(row_id,) for row_id, _, _ in plan.deletes]
+            )
+        _execute_batch(
+            cursor,
+            f"UPDATE {TABLE} SET text = %s, order_index = %s WHERE id = %s",
+            [(text, index, row_id) for row_id, _, text, index in plan.updates],
+        )
+        _execute_batch(
+            cursor,
+            f"UPDATE {TABLE} SET order_index = %s WHERE id = %s",
+            [(index, row_id) for row_id, _, index in plan.reorders],
+        )
+        if plan.inserts:
+            copy_chunks(cursor, copy_sql("csv"), csv_chunks(plan.inserts))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def colliding_positions(plan):
+    """
+    {lekce: [order_index, ...]} řádků k smazání, jejichž pozici po provedení
+    plánu obsadí kulička z katalogu. Bez --prune takové řádky zůstanou
+    a backend uvidí dvě kuličky na stejné pozici.
+    """
+    collisions = {}
+    for _, lesson_num, order_index in plan.deletes:
+        if order_index is not None and 0 <= order_index < catalog.count(lesson_num):
+            collisions.setdefault(lesson_num, []).append(order_index)
+    return {lesson_num: sorted(positions) for lesson_num, positions in sorted(collisions.items())}
+
+
+def print_plan(plan, prune=False):
+    summary = plan.summary()
+    if not summary:
+        print("Tabulka odpovídá katalogu, není co měnit.")
+        return
+    for lesson_num, counts in summary.items():
+        changes = ", ".join(f"{kind} {count}" for kind, count in counts.items() if count)
+        print(f"Lekce {lesson_num}: {changes}")
+    totals = ", ".join(f"{kind} {len(items)}" for kind, items in zip(CHANGE_KINDS, plan))
+    print(f"Celkem: {totals}")
+    if plan.deletes and not prune:
+        print(f"Řádky navíc ({len(plan.deletes)}) se bez --prune nesmažou.")
+        collisions = colliding_positions(plan)
+        if collisions:
+            where = "; ".join(
+                f"lekce {lesson_num}: {', '.join(map(str, positions))}"
+                for lesson_num, positions in collisions.items()
+            )
+            print(
+                f"Pozor: ponechané řádky mají order_index, který po synchronizaci používá "
+                f"jiná kulička, takže vzniknou duplicitní pozice ({where}). Použijte --prune."
+            )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Katalog kuliček do Postgres tabulky kulicky.")
+    parser.add_argument("--dsn", help="připojovací řetězec (výchozí: DATABASE_URL / DB_*)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = commands.add_parser("load", help="nahrát lekce jedním COPY")
+    load_parser.add_argument("--lessons", type=int, nargs="+", help="jen tyto lekce")
+    load_parser.add_argument("--format", choices=COPY_FORMATS, default="csv")
+    load_parser.add_argument(
+        "--replace", action="store_true", help="nejdřív smazat stávající řádky těchto lekcí"
+    )
+
+    sync_parser = commands.add_parser("sync", help="aplikovat jen rozdíl proti tabulce")
+    sync_parser.add_argument("--lessons", type=int, nargs="+", help="jen tyto lekce")
+    sync_parser.add_argument("--dry-run", action="store_true", help="jen vypsat plán")
+    sync_parser.add_argument(
+        "--prune", action="store_true", help="smazat i řádky, které v katalogu nejsou"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect(args.dsn)
+    try:
+        if args.command == "load":
+            started = time.perf_counter()
+            count = load(conn, lessons=args.lessons, fmt=args.format, replace=args.replace)
+            elapsed = time.perf_counter() - started
+            print(f"Nahráno {count} kuliček do {TABLE} za {elapsed * 1000:.0f} ms")
+        elif args.command == "sync":
+            plan = plan_sync(conn, lessons=args.lessons)
+            print_plan(plan, prune=args.prune)
+            if args.dry_run or plan.is_empty():
+                return 0
+            started = time.perf_counter()
+            apply_sync(conn, plan, prune=args.prune)
+            elapsed = time.perf_counter() - started
+            print(f"Synchronizace hotova za {elapsed * 1000:.0f} ms")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
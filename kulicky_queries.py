@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memoizované dotazy nad katalogem kuliček.
+
+Odvozené pohledy (počty, spojený text lekce, seřazené a zamíchané pořadí)
+se počítají jednou a drží v LRU cache s pevnou velikostí. Klíč obsahuje
+verzi katalogu (hash obsahu, KulickyCatalog.version). Po úpravě
+kulicky_data.py stačí importlib.reload(kulicky_data): verze se změní a při
+prvním dotazu se cache vyprázdní, takže se staré výsledky už nevrátí.
+
+    from kulicky_queries import queries
+    queries.lesson_text(4)
+    queries.shuffled(4, seed=42)
+    queries.cache_info()
+"""
+
+import random
+import sys
+from collections import OrderedDict
+from typing import NamedTuple
+
+import kulicky_data
+
+DEFAULT_MAXSIZE = 256
+SORT_KEYS = ("alpha", "length")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    maxsize: int
+    version: str
+
+
+class LRUCache:
+    """Omezená LRU cache s počítadly zásahů; None je platná hodnota."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize musí být alespoň 1")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = self._data[key] = compute()
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _default_catalog():
+    # Atribut se čte při každém dotazu, aby se projevil reload(kulicky_data)
+    return kulicky_data.catalog
+
+
+class CatalogQueries:
+    """
+    Dotazy nad katalogem vracené z LRU cache. Výsledky jsou neměnné
+    (n-tice, MappingProxyType, řetězce), takže je lze bezpečně sdílet;
+    get_kulicky_for_lesson() vrací jako originál nový seznam.
+    """
+
+    def __init__(self, catalog=None, maxsize=DEFAULT_MAXSIZE):
+        self._catalog = (lambda: catalog) if catalog is not None else _default_catalog
+        self._cache = LRUCache(maxsize)
+        self._version = None
+        self.invalidations = 0
+
+    @property
+    def catalog(self):
+        return self._catalog()
+
+    def _cached(self, query, args, compute):
+        catalog = self._catalog()
+        version = catalog.version
+        if version != self._version:
+            if self._version is not None:
+                self._cache.clear()
+                self.invalidations += 1
+            self._version = version
+        return self._cache.get_or_compute((version, query, args), lambda: compute(catalog))
+
+    def lesson(self, lesson_num):
+        """Kuličky lekce jako n-tice."""
+        return self._cached("lesson", (lesson_num,), lambda c: tuple(c.lesson(lesson_num)))
+
+    def get_kulicky_for_lesson(self, lesson_num):
+        """Stejné jako kulicky_data.get_kulicky_for_lesson(), ale přes cache."""
+        return list(self.lesson(lesson_num))
+
+    def counts(self):
+        """{lekce: počet kuliček} jen pro čtení."""
+        return self._cached("counts", (), lambda c: c.counts)
+
+    def total(self):
+        return self._cached("total", (), len)
+
+    def lesson_text(self, lesson_num, sep="\n"):
+        """Všechny kuličky lekce spojené oddělovačem."""
+        return self._cached("lesson_text", (lesson_num, sep), lambda c: sep.join(c.lesson(lesson_num)))
+
+    def catalog_text(self, lessons=None, sep="\n"):
+        """Kuličky vybraných lekcí (výchozí: všech) spojené oddělovačem."""
+        wanted = None if lessons is None else tuple(lessons)
+
+        def compute(c):
+            return sep.join(self.lesson_text(n, sep) for n in (c.lessons() if wanted is None else wanted))
+
+        return self._cached("catalog_text", (wanted, sep), compute)
+
+    def sorted(self, lesson_num, key="alpha", reverse=False):
+        """
+        Kuličky lekce seřazené podle abecedy (bez ohledu na diakritiku
+        a velikost písmen) nebo podle délky textu.
+        """
+        if key not in SORT_KEYS:
+            raise ValueError(f"Neznámé řazení {key!r}, možnosti: {', '.join(SORT_KEYS)}")
+
+        def compute(c):
+            records = c.records(lesson_num)
+            if key == "alpha":
+                ordered = sorted(records, key=lambda r: (r.normalized, r.text), reverse=reverse)
+            else:
+                ordered = sorted(records, key=lambda r: (len(r.text), r.index), reverse=reverse)
+            return tuple(record.text for record in ordered)
+
+        return self._cached("sorted", (lesson_num, key, reverse), compute)
+
+    def shuffled(self, lesson_num, seed):
+        """Kuličky lekce v pseudonáhodném pořadí, pro stejný seed vždy stejném."""
+
+        def compute(c):
+            texts = list(c.lesson(lesson_num))
+            random.Random(seed).shuffle(texts)
+            return tuple(texts)
+
+        return self._cached("shuffled", (lesson_num, seed), compute)
+
+    def cache_info(self):
+        cache = self._cache
+        return CacheInfo(
+            cache.hits, cache.misses, cache.evictions, self.invalidations,
+            len(cache), cache.maxsize, self._version,
+        )
+
+    def cache_clear(self):
+        self._cache.clear()
+
+
+queries = CatalogQueries()
+
+
+if __name__ == "__main__":
+    lesson_num = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    for _ in range(2):
+        queries.lesson_text(lesson_num)
+        queries.sorted(lesson_num)
+        queries.shuffled(lesson_num, seed=0)
+    print(f"Lekce {lesson_num}: {queries.counts()[lesson_num]} kuliček, {queries.cache_info()}")
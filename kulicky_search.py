@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fulltextové vyhledávání v kuličkách bez ohledu na velikost písmen a diakritiku.
+
+Invertovaný index nad normalizovanými tokeny ("peníze" -> "penize") s předem
+spočítanými prefixy, takže dotaz je jen pár slovníkových lookupů a průnik
+množin. Tokeny se navíc lehce stemmují (odtržení pádových koncovek), aby
+"strachu" našlo i "strach" a "peníze" i "peněz".
+
+    from kulicky_search import search
+    search("strach z", lesson=7, limit=5)
+"""
+
+import heapq
+import math
+import re
+import sys
+from typing import NamedTuple
+
+from kulicky_data import catalog, normalize
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Pádové koncovky (bez diakritiky) pro lehký stemmer, od nejdelších
+_SUFFIXES = sorted(
+    [
+        "atech", "etem", "atum", "ach", "ech", "ich", "ata", "aty", "ych", "ama", "ami", "ove",
+        "ovi", "ymi", "em", "es", "im", "um", "at", "am", "os", "us", "ym", "mi",
+        "ou", "a", "e", "i", "o", "u", "y",
+    ],
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 4
+
+# Střídání í/ě v poslední slabice kmene ("peníze" / "peněz", "penězi"): po
+# odstranění diakritiky zbude i/e, sjednotí se na e
+_ALTERNATION_RE = re.compile(r"i(?=[^aeiouy]+$)")
+
+# Váhy shody jednoho slova dotazu
+_EXACT_WEIGHT = 3.0
+_STEM_WEIGHT = 2.0
+_PREFIX_WEIGHT = 1.0
+_PHRASE_BONUS = 2.0
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def stem(token):
+    """
+    Lehký český stemmer: odtrhne nejdelší pádovou koncovku, pokud zbude aspoň
+    4 znaky, a sjednotí střídání í/ě v poslední slabice kmene.
+    """
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            token = token[: -len(suffix)]
+            break
+    if len(token) >= _MIN_STEM:
+        token = _ALTERNATION_RE.sub("e", token, count=1)
+    return token
+
+
+class SearchHit(NamedTuple):
+    lesson: int
+    index: int
+    text: str
+    score: float
+
+
+class KulickySearchIndex:
+    """Invertovaný index nad (lekce, pozice, text) z KulickyCatalog."""
+
+    def __init__(self, items):
+        self._items = []
+        self._normalized = []
+        self._lengths = []
+        self._lesson_ranges = {}
+        self._exact = {}
+        self._stems = {}
+        prefixes = {}
+        for ordinal, (lesson_num, index, text) in enumerate(items):
+            self._items.append((lesson_num, index, text))
+            self._normalized.append(" ".join(tokenize(text)))
+            self._lengths.append(len(text))
+            start, _ = self._lesson_ranges.get(lesson_num, (ordinal, ordinal))
+            self._lesson_ranges[lesson_num] = (start, ordinal + 1)
+            for token in set(tokenize(text)):
+                self._exact.setdefault(token, set()).add(ordinal)
+                self._stems.setdefault(stem(token), set()).add(ordinal)
+                for end in range(1, len(token) + 1):
+                    prefixes.setdefault(token[:end], set()).add(ordinal)
+        self._prefixes = {prefix: frozenset(ids) for prefix, ids in prefixes.items()}
+        self._exact = {token: frozenset(ids) for token, ids in self._exact.items()}
+        self._stems = {token: frozenset(ids) for token, ids in self._stems.items()}
+
+    def __len__(self):
+        return len(self._items)
+
+    def _matches(self, token):
+        """Položky, kde některé slovo začíná tokenem nebo má stejný kmen."""
+        by_prefix = self._prefixes.get(token, frozenset())
+        by_stem = self._stems.get(stem(token), frozenset())
+        return by_prefix | by_stem if by_stem else by_prefix
+
+    def search(self, query, lesson=None, limit=10):
+        """
+        Vrátí nejvýše limit výsledků (SearchHit) seřazených podle skóre; všechna
+        slova dotazu musí sedět (přesně, kmenem nebo jako prefix slova).
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        matches = [self._matches(token) for token in tokens]
+        candidates = min(matches, key=len)
+        for ids in matches:
+            if ids is not candidates:
+                candidates = candidates & ids
+            if not candidates:
+                return []
+
+        if lesson is not None:
+            start, end = self._lesson_ranges.get(lesson, (0, 0))
+            candidates = [ordinal for ordinal in candidates if start <= ordinal < end]
+
+        # Každý kandidát sedí aspoň prefixem, přesná a kmenová shoda jen přidávají
+        total = len(self._items)
+        candidates = set(candidates)
+        scores = dict.fromkeys(candidates, 0.0)
+        for token, ids in zip(tokens, matches):
+            idf = math.log(1 + total / len(ids))
+            exact = self._exact.get(token, frozenset())
+            stems = self._stems.get(stem(token), frozenset()) - exact
+            for ordinal in candidates & exact:
+                scores[ordinal] += (_EXACT_WEIGHT - _PREFIX_WEIGHT) * idf
+            for ordinal in candidates & stems:
+                scores[ordinal] += (_STEM_WEIGHT - _PREFIX_WEIGHT) * idf
+            base = _PREFIX_WEIGHT * idf
+            for ordinal in scores:
+                scores[ordinal] += base
+        if len(tokens) > 1:
+            phrase = " ".join(tokens)
+            for ordinal in scores:
+                if phrase in self._normalized[ordinal]:
+                    scores[ordinal] += _PHRASE_BONUS
+
+        # Vyšší skóre, pak kratší text, pak pořadí v katalogu
+        ranked = heapq.nsmallest(
+            limit,
+            scores,
+            key=lambda o: (-scores[o], self._lengths[o], o),
+        )
+        return [SearchHit(*self._items[o], scores[o]) for o in ranked]
+
+
+_default_index = None
+
+
+def get_index():
+    """Index nad celým katalogem, sestavený při prvním použití."""
+    global _default_index
+    if _default_index is None:
+        _default_index = KulickySearchIndex(catalog)
+    return _default_index
+
+
+def search(query, lesson=None, limit=10):
+    """Vyhledá kuličky v celém katalogu, volitelně jen v jedné lekci."""
+    return get_index().search(query, lesson=lesson, limit=limit)
+
+
+if __name__ == "__main__":
+    for hit in search(" ".join(sys.argv[1:]) or "strach z"):
+        print(f"Lekce {hit.lesson} #{hit.index}: {hit.text} ({hit.score:.2f})")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read-only HTTP služba katalogu kuliček nad asynciem (volitelně uvloop).
+
+Katalog je statický, takže odpovědi pro /lessons a /lessons/{n} se
+serializují jednou při startu (včetně gzip varianty a ETagu) a na požadavek
+se jen zapíšou na socket; bez Express middleware a bez dotazu do Postgres.
+
+    GET /lessons                    seznam lekcí s názvy a počty
+    GET /lessons/{n}                kuličky lekce (stejný tvar jako build_catalog_bundles)
+    GET /search?q=..&lesson=&limit= fulltext přes kulicky_search
+    GET /health
+
+Podporuje HTTP/1.1 keep-alive i pipelining, HEAD, If-None-Match (304)
+a Accept-Encoding: gzip.
+
+    python kulicky_server.py --host 0.0.0.0 --port 8090
+    python load_test_kulicky.py --url http://127.0.0.1:8090 --paths /lessons/4
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import sys
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from build_catalog_bundles import lesson_payload
+from kulicky_data import catalog, lesson_titles
+from kulicky_queries import LRUCache
+from kulicky_search import get_index
+
+try:
+    import uvloop
+except ImportError:  # stdlib smyčka stačí, uvloop jen přidá výkon
+    uvloop = None
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8090
+MAX_HEADER_BYTES = 16 * 1024
+SEARCH_CACHE_SIZE = 1024
+SEARCH_MAX_LIMIT = 100
+CATALOG_CACHE_CONTROL = "public, max-age=300"
+SEARCH_CACHE_CONTROL = "public, max-age=60"
+
+_REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+}
+
+
+def _json_bytes(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class PreparedResponse:
+    """
+    Předem sestavená odpověď: hlavička bez ukončujícího CRLF (aby šlo přidat
+    Connection: close), tělo, 304 hlavička a volitelně gzip varianta s vlastním
+    ETagem.
+    """
+
+    def __init__(self, body, status=200, cache_control=None, compress=False, extra_headers=()):
+        self.status = status
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"' if status == 200 else None
+        self.body = body
+        self.head = self._head(status, body, self.etag, cache_control, extra_headers)
+        self.not_modified = self._not_modified(self.etag, cache_control) if self.etag else None
+        self.gzip = None
+        if compress and len(body) > 512:
+            compressed = gzip.compress(body, 6, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip = PreparedResponse.__new__(PreparedResponse)
+                self.gzip.status = status
+                self.gzip.etag = self.etag[:-1] + '-gz"'
+                self.gzip.body = compressed
+                self.gzip.head = self._head(
+                    status, compressed, self.gzip.etag, cache_control,
+                    (*extra_headers, ("Content-Encoding", "gzip")),
+                )
+                self.gzip.not_modified = self._not_modified(self.gzip.etag, cache_control)
+                self.gzip.gzip = None
+
+    @staticmethod
+    def _head(status, body, etag, cache_control, extra_headers):
+        lines = [
+            f"HTTP/1.1 {status} {_REASONS[status]}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+        ]
+        if etag:
+            lines.append(f"ETag: {etag}")
+            lines.append("Vary: Accept-Encoding")
+        if cache_control:
+            lines.append(f"Cache-Control: {cache_control}")
+        lines += [f"{name}: {value}" for name, value in extra_headers]
+        return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+    @staticmethod
+    def _not_modified(etag, cache_control):
+        lines = ["HTTP/1.1 304 Not Modified", f"ETag: {etag}", "Vary: Accept-Encoding"]
+        if cache_control:
+            lines.append(f"Cache-Control: {cache_control}")
+        return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+
+def _error(status, message, extra_headers=()):
+    return PreparedResponse(_json_bytes({"error": message}), status, extra_headers=extra_headers)
+
+
+NOT_FOUND = _error(404, "Nenalezeno")
+BAD_REQUEST = _error(400, "Chybný požadavek")
+METHOD_NOT_ALLOWED = _error(405, "Povoleny jsou jen GET a HEAD", (("Allow", "GET, HEAD"),))
+HEADERS_TOO_LARGE = _error(431, "Příliš velké hlavičky")
+
+
+def build_routes():
+    """Předem serializované odpovědi pro všechny statické cesty."""
+    lessons = [
+        {"lesson": n, "title": lesson_titles.get(n), "count": catalog.count(n)}
+        for n in catalog.lessons()
+    ]
+    routes = {
+        "/lessons": {"version": catalog.version, "lessons": lessons},
+        "/health": {"status": "ok", "version": catalog.version, "items": len(catalog)},
+    }
+    for lesson_num in catalog.lessons():
+        routes[f"/lessons/{lesson_num}"] = lesson_payload(lesson_num)
+    return {
+        path: PreparedResponse(_json_bytes(payload), cache_control=CATALOG_CACHE_CONTROL, compress=True)
+        for path, payload in routes.items()
+    }
+
+
+class SearchHandler:
+    """Výsledky hledání, serializované a cachované podle (dotaz, lekce, limit)."""
+
+    def __init__(self, cache_size=SEARCH_CACHE_SIZE):
+        self._index = get_index()
+        self._cache = LRUCache(cache_size)
+
+    def __call__(self, query_string):
+        params = parse_qs(query_string)
+        query = params.get("q", [""])[0].strip()
+        try:
+            lesson_num = int(params["lesson"][0]) if "lesson" in params else None
+            limit = min(int(params.get("limit", ["10"])[0]), SEARCH_MAX_LIMIT)
+        except ValueError:
+            return BAD_REQUEST
+        if not query or limit < 1:
+            return BAD_REQUEST
+        key = (query, lesson_num, limit)
+        return self._cache.get_or_compute(key, lambda: self._render(*key))
+
+    def _render(self, query, lesson_num, limit):
+        hits = [
+            {
+                "lesson": hit.lesson,
+                "index": hit.index,
+                "id": catalog.item_id(hit.lesson, hit.index),
+                "text": hit.text,
+                "score": round(hit.score, 3),
+            }
+            for hit in self._index.search(query, lesson=lesson_num, limit=limit)
+        ]
+        body = _json_bytes({"query": query, "lesson": lesson_num, "hits": hits})
+        return PreparedResponse(body, cache_control=SEARCH_CACHE_CONTROL, compress=True)
+
+
+def _etag_matches(header, etag):
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def _accepts_gzip(header):
+    """
+    Zda Accept-Encoding připouští gzip: explicitně s q > 0, nebo přes "*",
+    pokud gzip není uveden zvlášť. "gzip;q=0" gzip zakazuje.
+    """
+    wildcard = None
+    for coding in header.split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        if name not in ("gzip", "x-gzip", "*"):
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == "*":
+            wildcard = quality > 0
+        else:
+            return quality > 0
+    return bool(wildcard)
+
+
+class CatalogProtocol(asyncio.Protocol):
+    """Jedno spojení: parsuje požadavky z bufferu (i víc najednou) a odpovídá."""
+
+    def __init__(self, routes, search):
+        self._routes = routes
+        self._search = search
+        self._transport = None
+        self._buffer = b""
+        self._accept_encoding = None
+        self._gzip = False
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def data_received(self, data):
+        self._buffer += data
+        while self._transport is not None:
+            end = self._buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self._buffer) > MAX_HEADER_BYTES:
+                    self._send(HEADERS_TOO_LARGE, "GET", {}, keep_alive=False)
+                return
+            head = self._buffer[:end].decode("latin-1")
+            request_line, _, header_block = head.partition("\r\n")
+            headers = {}
+            for line in header_block.split("\r\n"):
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            # Těla se nečtou (služba je jen pro čtení), ale musí se přeskočit
+            try:
+                body_length = int(headers.get("content-length", 0))
+            except ValueError:
+                body_length = -1
+            if body_length < 0:
+                self._send(BAD_REQUEST, "GET", headers, keep_alive=False)
+                return
+            if len(self._buffer) < end + 4 + body_length:
+                return
+            self._buffer = self._buffer[end + 4 + body_length:]
+            self._handle(request_line, headers)
+
+    def _handle(self, request_line, headers):
+        parts = request_line.split(" ")
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            self._send(BAD_REQUEST, "GET", headers, keep_alive=False)
+            return
+        method, target, version = parts
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+        http10 = version == "HTTP/1.0"
+
+        if method not in ("GET", "HEAD"):
+            self._send(METHOD_NOT_ALLOWED, method, headers, keep_alive, http10)
+            return
+        path, _, query_string = target.partition("?")
+        response = self._routes.get(path)
+        if response is None:
+            if path == "/search":
+                response = self._search(query_string)
+            else:
+                response = self._routes.get(unquote(urlsplit(target).path).rstrip("/"), NOT_FOUND)
+        self._send(response, method, headers, keep_alive, http10)
+
+    def _wants_gzip(self, headers):
+        # Klient posílá na spojení stále stejnou hlavičku, stačí ji parsovat jednou
+        accept_encoding = headers.get("accept-encoding", "")
+        if accept_encoding != self._accept_encoding:
+            self._accept_encoding = accept_encoding
+            self._gzip = _accepts_gzip(accept_encoding)
+        return self._gzip
+
+    def _send(self, response, method, headers, keep_alive, http10=False):
+        if response.gzip is not None and self._wants_gzip(headers):
+            response = response.gzip
+        if not keep_alive:
+            end = b"Connection: close\r\n\r\n"
+        elif http10:
+            # HTTP/1.0 klient bez této hlavičky považuje spojení za ukončené
+            end = b"Connection: keep-alive\r\n\r\n"
+        else:
+            end = b"\r\n"
+        if_none_match = headers.get("if-none-match")
+        if response.etag and if_none_match and _etag_matches(if_none_match, response.etag):
+            self._transport.write(response.not_modified + end)
+        elif method == "HEAD":
+            self._transport.write(response.head + end)
+        else:
+            self._transport.writelines((response.head, end, response.body))
+        if not keep_alive:
+            self._transport.close()
+            self._transport = None
+
+    def connection_lost(self, exc):
+        self._transport = None
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, reuse_port=False):
+    routes = build_routes()
+    search = SearchHandler()
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(
+        lambda: CatalogProtocol(routes, search), host, port,
+        reuse_port=reuse_port or None, backlog=1024,
+    )
+    addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    loop_name = "uvloop" if uvloop is not None and "uvloop" in type(loop).__module__ else "asyncio"
+    print(f"Katalog kuliček ({len(catalog)} kuliček, verze {catalog.version}) na {addresses} [{loop_name}]",
+          file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Read-only HTTP služba katalogu kuliček.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--reuse-port", action="store_true",
+                        help="SO_REUSEPORT, aby šlo spustit víc procesů na jednom portu")
+    parser.add_argument("--no-uvloop", action="store_true", help="použít stdlib smyčku i s uvloop")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if uvloop is not None and not args.no_uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    try:
+        asyncio.run(serve(args.host, args.port, args.reuse_port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
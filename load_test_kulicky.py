@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zátěžový test kulicky_server.py: N souběžných keep-alive spojení po dobu
+--duration sekund střídá zadané cesty a měří propustnost a latence.
+
+    python load_test_kulicky.py --url http://127.0.0.1:8090 \\
+        --paths /lessons /lessons/4 "/search?q=strach" --connections 64 --duration 10
+
+S --etag posílá If-None-Match s ETagem z první odpovědi (měří cestu 304).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ["/lessons", "/lessons/4", "/search?q=strach"]
+
+
+async def _read_response(reader):
+    """(status, hlavičky) po přečtení celé odpovědi včetně těla."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length and status != 304:
+        await reader.readexactly(length)
+    return status, headers
+
+
+async def _connection(host, port, requests, deadline, use_etag, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path, base = requests[i % len(requests)]
+            i += 1
+            request = base
+            if use_etag and path in etags:
+                request = base[:-2] + f"If-None-Match: {etags[path]}\r\n\r\n".encode("latin-1")
+            start = time.perf_counter()
+            writer.write(request)
+            status, headers = await _read_response(reader)
+            stats["latencies"].append(time.perf_counter() - start)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+            if "etag" in headers:
+                etags[path] = headers["etag"]
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run(url, paths, connections, duration, gzip, use_etag):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    extra = "Accept-Encoding: gzip\r\n" if gzip else ""
+    requests = [
+        (path, f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n".encode("latin-1"))
+        for path in paths
+    ]
+    stats = {"latencies": [], "status": {}}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _connection(host, port, requests[i % len(requests):] + requests[:i % len(requests)],
+                    deadline, use_etag, stats)
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(stats["latencies"])
+    return {
+        "url": url,
+        "paths": paths,
+        "connections": connections,
+        "seconds": round(elapsed, 2),
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed),
+        "status": {str(code): count for code, count in sorted(stats["status"].items())},
+        "latency_ms": {
+            name: round(_percentile(latencies, fraction) * 1000, 3)
+            for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+        },
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Zátěžový test katalogové služby.")
+    parser.add_argument("--url", default="http://127.0.0.1:8090")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--connections", "-c", type=int, default=32)
+    parser.add_argument("--duration", "-d", type=float, default=5.0)
+    parser.add_argument("--gzip", action="store_true", help="posílat Accept-Encoding: gzip")
+    parser.add_argument("--etag", action="store_true", help="posílat If-None-Match")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args.url, args.paths, args.connections, args.duration, args.gzip, args.etag))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Náhodné porovnání make_background_transparent a trim_uniform_border
+s původními smyčkami přes pixely (generate_favicons.py před vektorizací):
+NumPy cesta po celém obrázku i po pásech rows=, čistě pythonová záloha
+bez NumPy a ořez okrajů po pásech musí dát bajtově stejný výsledek.
+
+    python -m pytest test_generate_favicons.py
+"""
+
+import random
+
+import pytest
+from PIL import Image
+
+import generate_favicons as gf
+
+CASES = range(60)
+
+
+def baseline_make_background_transparent(image, tolerance=30):
+    """Původní implementace: vzorek rohů a smyčka přes všechny pixely."""
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    rgb = image.convert("RGB")
+    width, height = image.size
+    samples = [
+        rgb.getpixel((0, 0)),
+        rgb.getpixel((width - 1, 0)),
+        rgb.getpixel((0, height - 1)),
+        rgb.getpixel((width - 1, height - 1)),
+    ]
+    avg = tuple(sum(c[i] for c in samples) // 4 for i in range(3))
+    if sum(avg) / 3 > 40:
+        return image
+    px = image.load()
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = px[x, y]
+            if a == 0:
+                continue
+            if sum((c - avg[i]) ** 2 for i, c in enumerate((r, g, b))) <= tolerance * tolerance:
+                px[x, y] = (r, g, b, 0)
+    return image
+
+
+def baseline_trim_uniform_border(image, tolerance=6):
+    """Původní implementace: sloupce a řádky od krajů, dokud sedí barva rohu."""
+    if image.mode not in ("RGB", "RGBA"):
+        return image
+    rgb = image.convert("RGB")
+    width, height = rgb.size
+    corner_color = rgb.getpixel((0, 0))
+
+    def is_similar(c1, c2):
+        return all(abs(c1[i] - c2[i]) <= tolerance for i in range(3))
+
+    px = rgb.load()
+
+    def uniform(xs, ys):
+        return all(is_similar(px[x, y], corner_color) for x in xs for y in ys)
+
+    left = 0
+    while left < width and uniform([left], range(height)):
+        left += 1
+    right = width - 1
+    while right >= 0 and uniform([right], range(height)):
+        right -= 1
+    top = 0
+    while top < height and uniform(range(width), [top]):
+        top += 1
+    bottom = height - 1
+    while bottom >= 0 and uniform(range(width), [bottom]):
+        bottom -= 1
+
+    if left >= right or top >= bottom:
+        return image
+    if left == 0 and right == width - 1 and top == 0 and bottom == height - 1:
+        return image
+    return image.crop((left, top, right + 1, bottom + 1))
+
+
+def random_icon(rng, mode="RGBA"):
+    """
+    Malý obrázek s tmavým, mírně zašuměným pozadím a několika barevnými
+    obdélníky; občas světlé pozadí nebo průhledné pixely.
+    """
+    width, height = rng.randint(1, 40), rng.randint(1, 40)
+    dark = rng.random() < 0.85
+    base = [rng.randint(0, 40) if dark else rng.randint(50, 255) for _ in range(3)]
+    noise = rng.randint(0, 12)
+    pixels = []
+    for _ in range(width * height):
+        rgb = [min(255, max(0, c + rng.randint(-noise, noise))) for c in base]
+        alpha = 0 if rng.random() < 0.05 else rng.choice((255, 255, 255, rng.randint(1, 254)))
+        pixels.append((*rgb, alpha))
+    image = Image.new("RGBA", (width, height))
+    image.putdata(pixels)
+    for _ in range(rng.randint(0, 3)):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = rng.randint(x0 + 1, width), rng.randint(y0 + 1, height)
+        color = tuple(rng.randint(0, 255) for _ in range(3)) + (rng.choice((0, 128, 255)),)
+        image.paste(color, (x0, y0, x1, y1))
+    return image if mode == "RGBA" else image.convert(mode)
+
+
+def random_rows(rng, height):
+    return rng.choice([None, 1, 2, 3, rng.randint(1, height), height, height + 5])
+
+
+def assert_same_image(actual, expected):
+    assert (actual.mode, actual.size) == (expected.mode, expected.size)
+    assert actual.tobytes() == expected.tobytes()
+
+
+@pytest.mark.skipif(gf.np is None, reason="NumPy není nainstalované")
+@pytest.mark.parametrize("seed", CASES)
+def test_background_numpy_matches_baseline(seed):
+    rng = random.Random(seed)
+    image = random_icon(rng, rng.choice(["RGBA", "RGBA", "RGB"]))
+    tolerance = rng.randint(0, 40)
+    rows = random_rows(rng, image.height)
+
+    expected = baseline_make_background_transparent(image.copy(), tolerance)
+    assert_same_image(gf.make_background_transparent(image.copy(), tolerance, rows), expected)
+
+
+@pytest.mark.parametrize("seed", CASES)
+def test_background_fallback_without_numpy_matches_baseline(seed, monkeypatch):
+    monkeypatch.setattr(gf, "np", None)
+    rng = random.Random(1000 + seed)
+    image = random_icon(rng)
+    tolerance = rng.randint(0, 40)
+
+    expected = baseline_make_background_transparent(image.copy(), tolerance)
+    actual = gf.make_background_transparent(image.copy(), tolerance, random_rows(rng, image.height))
+    assert_same_image(actual, expected)
+
+
+@pytest.mark.parametrize("seed", CASES)
+def test_trim_uniform_border_matches_baseline(seed):
+    rng = random.Random(2000 + seed)
+    image = random_icon(rng, rng.choice(["RGBA", "RGB", "L"]))
+    tolerance = rng.randint(0, 12)
+    rows = random_rows(rng, image.height)
+
+    expected = baseline_trim_uniform_border(image, tolerance)
+    assert_same_image(gf.trim_uniform_border(image, tolerance, rows), expected)
+
+
+@pytest.mark.parametrize("seed", CASES)
+def test_trim_uniform_border_framed_content_matches_baseline(seed):
+    # Jednobarevný rám kolem obsahu, aby se ořez opravdu uplatnil
+    rng = random.Random(3000 + seed)
+    inner = random_icon(rng, "RGB")
+    pad = [rng.randint(0, 6) for _ in range(4)]
+    image = Image.new(
+        "RGB",
+        (inner.width + pad[0] + pad[2], inner.height + pad[1] + pad[3]),
+        tuple(rng.randint(0, 255) for _ in range(3)),
+    )
+    image.paste(inner, (pad[0], pad[1]))
+    tolerance = rng.randint(0, 12)
+    rows = random_rows(rng, image.height)
+
+    expected = baseline_trim_uniform_border(image, tolerance)
+    assert_same_image(gf.trim_uniform_border(image, tolerance, rows), expected)
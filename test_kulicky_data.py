@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Testy katalogu kulicky_data: sdílené instance Kulicka musí zůstat neměnné.
+
+    python -m pytest test_kulicky_data.py
+"""
+
+import json
+
+import pytest
+
+import kulicky_data
+from kulicky_data import catalog
+
+
+def test_kulicky_data_is_plain_dict():
+    assert isinstance(kulicky_data.kulicky_data, dict)
+    json.dumps(kulicky_data.kulicky_data, ensure_ascii=False)
+
+
+def test_records_are_shared_and_immutable():
+    record = catalog.record(4, 0)
+    assert catalog.records(4)[0] is record
+
+    with pytest.raises(AttributeError):
+        record.text = "jiný text"
+    with pytest.raises(AttributeError):
+        del record.id
+    with pytest.raises(AttributeError):
+        record.poznamka = "navíc"
+    assert record.text == catalog.lesson(4)[0]
+
+
+def test_normalized_is_cached_outside_the_instance():
+    record = catalog.record(4, 0)
+    assert record.normalized == kulicky_data.normalize(record.text)
+    assert record.normalized is catalog.record(4, 0).normalized
+    assert not hasattr(record, "__dict__")
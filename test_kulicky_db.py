@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Testy kulicky_db bez Postgres: falešné spojení a kurzor zaznamenají SQL
+a data poslaná do COPY, ať přes psycopg 3 (cursor.copy), nebo psycopg2
+(cursor.copy_expert).
+
+    python -m pytest test_kulicky_db.py
+"""
+
+import contextlib
+import csv
+import io
+import struct
+
+import pytest
+
+import kulicky_db
+from kulicky_data import catalog
+
+
+class FakeCopy:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def write(self, data):
+        self._payload += data
+
+
+class _FakeCursorBase:
+    def __init__(self, rows=()):
+        self.executed = []
+        self.copies = []
+        self._rows = list(rows)
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def executemany(self, sql, params):
+        self.executed.append((sql, list(params)))
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeCursor(_FakeCursorBase):
+    """Kurzor ve stylu psycopg 3: COPY přes copy() jako context manager."""
+
+    @contextlib.contextmanager
+    def copy(self, sql):
+        payload = bytearray()
+        yield FakeCopy(payload)
+        self.copies.append((sql, bytes(payload)))
+
+
+class FakePsycopg2Cursor(_FakeCursorBase):
+    """Kurzor ve stylu psycopg2: COPY přes copy_expert() a souborový objekt."""
+
+    def copy_expert(self, sql, file, size=8192):
+        payload = bytearray()
+        while True:
+            data = file.read(size)
+            if not data:
+                break
+            payload += data
+        self.copies.append((sql, bytes(payload)))
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def parse_csv(payload):
+    return [
+        (int(lesson_id), text, int(order_index))
+        for lesson_id, text, order_index in csv.reader(io.StringIO(payload.decode("utf-8")))
+    ]
+
+
+def parse_binary(payload):
+    """Dekóduje binární COPY (int4, text, int4) zpět na n-tice."""
+    header = b"PGCOPY\n\xff\r\n\x00"
+    assert payload.startswith(header)
+    pos = len(header) + 8  # flags + délka rozšíření hlavičky
+    rows = []
+    while True:
+        (fields,) = struct.unpack_from("!h", payload, pos)
+        pos += 2
+        if fields == -1:
+            break
+        assert fields == len(kulicky_db.COLUMNS)
+        (_, lesson_id) = struct.unpack_from("!ii", payload, pos)
+        pos += 8
+        (length,) = struct.unpack_from("!i", payload, pos)
+        pos += 4
+        text = payload[pos:pos + length].decode("utf-8")
+        pos += length
+        (_, order_index) = struct.unpack_from("!ii", payload, pos)
+        pos += 8
+        rows.append((lesson_id, text, order_index))
+    assert pos == len(payload)
+    return rows
+
+
+PARSERS = {"csv": parse_csv, "binary": parse_binary}
+
+
+@pytest.mark.parametrize("cursor_class", [FakeCursor, FakePsycopg2Cursor])
+@pytest.mark.parametrize("fmt", kulicky_db.COPY_FORMATS)
+def test_load_sends_every_row_in_one_copy(cursor_class, fmt):
+    cursor = cursor_class()
+    conn = FakeConnection(cursor)
+
+    count = kulicky_db.load(conn, fmt=fmt)
+
+    assert count == len(catalog)
+    assert len(cursor.copies) == 1
+    sql, payload = cursor.copies[0]
+    assert sql == kulicky_db.copy_sql(fmt)
+    assert PARSERS[fmt](payload) == list(kulicky_db.iter_rows())
+    assert (conn.commits, conn.rollbacks) == (1, 0)
+
+
+@pytest.mark.parametrize("fmt", kulicky_db.COPY_FORMATS)
+def test_load_round_trips_special_characters(fmt):
+    rows = [(4, 'čára, "uvozovky" a\\zpětné lomítko', 0), (4, "", 1), (5, "žluťoučký kůň", 0)]
+    chunks = kulicky_db.binary_chunks(rows) if fmt == "binary" else kulicky_db.csv_chunks(rows)
+    assert PARSERS[fmt](b"".join(chunks)) == rows
+
+
+def test_csv_quotes_empty_text_so_copy_does_not_read_null():
+    payload = b"".join(kulicky_db.csv_chunks([(4, "", 0)]))
+    assert payload == b'4,"",0\n'
+
+
+def test_load_replace_deletes_selected_lessons_first():
+    cursor = FakeCursor()
+    conn = FakeConnection(cursor)
+
+    count = kulicky_db.load(conn, lessons=[4, 5], replace=True)
+
+    assert count == catalog.count(4) + catalog.count(5)
+    assert cursor.executed == [(f"DELETE FROM {kulicky_db.TABLE} WHERE lesson_id = ANY(%s)", ([4, 5],))]
+    assert {row[0] for row in parse_csv(cursor.copies[0][1])} == {4, 5}
+
+
+def test_load_rolls_back_when_copy_fails():
+    class FailingCursor(FakeCursor):
+        @contextlib.contextmanager
+        def copy(self, sql):
+            raise RuntimeError("spojení ztraceno")
+            yield
+
+    conn = FakeConnection(FailingCursor())
+    with pytest.raises(RuntimeError):
+        kulicky_db.load(conn)
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_load_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        kulicky_db.load(FakeConnection(FakeCursor()), fmt="json")
+
+
+def diff(desired, existing):
+    """SyncPlan jedné lekce (číslo 4) pro řádky (id, order_index, text)."""
+    plan = kulicky_db.SyncPlan([], [], [], [])
+    kulicky_db._diff_lesson(4, desired, existing, plan)
+    return plan
+
+
+def test_diff_unchanged_lesson_is_empty():
+    assert diff(["a", "b"], [(1, 0, "a"), (2, 1, "b")]).is_empty()
+
+
+def test_diff_swap_only_reorders():
+    plan = diff(["b", "a"], [(1, 0, "a"), (2, 1, "b")])
+    assert sorted(plan.reorders) == [(1, 4, 1), (2, 4, 0)]
+    assert (plan.inserts, plan.updates, plan.deletes) == ([], [], [])
+
+
+def test_diff_edit_updates_text_in_place_and_keeps_row_id():
+    plan = diff(["a", "B", "c"], [(1, 0, "a"), (2, 1, "b"), (3, 2, "c")])
+    assert plan.updates == [(2, 4, "B", 1)]
+    assert (plan.inserts, plan.reorders, plan.deletes) == ([], [], [])
+
+
+def test_diff_insert_at_front_shifts_existing_rows():
+    plan = diff(["x", "a", "b"], [(1, 0, "a"), (2, 1, "b")])
+    assert plan.inserts == [(4, "x", 0)]
+    assert sorted(plan.reorders) == [(1, 4, 1), (2, 4, 2)]
+    assert (plan.updates, plan.deletes) == ([], [])
+
+
+def test_diff_delete_moves_later_rows_up():
+    plan = diff(["a", "c"], [(1, 0, "a"), (2, 1, "b"), (3, 2, "c")])
+    assert plan.reorders == [(3, 4, 1)]
+    assert plan.deletes == [(2, 4, 1)]
+    assert (plan.inserts, plan.updates) == ([], [])
+
+
+def test_diff_repeated_text_keeps_each_row_once():
+    existing = [(1, 0, "a"), (2, 1, "a"), (3, 2, "b")]
+    plan = diff(["a", "b", "a"], existing)
+    assert sorted(plan.reorders) == [(2, 4, 2), (3, 4, 1)]
+    assert (plan.inserts, plan.updates, plan.deletes) == ([], [], [])
+
+    plan = diff(["a"], existing)
+    assert sorted(plan.deletes) == [(2, 4, 1), (3, 4, 2)]
+    assert (plan.inserts, plan.updates, plan.reorders) == ([], [], [])
+
+
+def test_diff_rows_without_order_index_are_matched_last():
+    plan = diff(["a", "b"], [(1, None, "a"), (2, 0, "a"), (3, 1, "b")])
+    assert plan.deletes == [(1, 4, None)]
+    assert (plan.inserts, plan.updates, plan.reorders) == ([], [], [])
+
+
+def catalog_rows(lesson_num, first_id=1):
+    return [
+        (first_id + index, lesson_num, index, text)
+        for index, text in enumerate(catalog.lesson(lesson_num))
+    ]
+
+
+def test_plan_sync_against_matching_table_is_empty():
+    cursor = FakeCursor(catalog_rows(4))
+    assert kulicky_db.plan_sync(FakeConnection(cursor), lessons=[4]).is_empty()
+
+
+def test_apply_sync_batches_changes_and_prunes_only_when_asked():
+    rows = catalog_rows(4)
+    # Smazaná kulička na pozici 0 (ostatní se posunou) a jeden řádek navíc na konci
+    existing = [(900, 4, 0, "už není v katalogu")] + [
+        (row_id, lesson_num, index + 1, text) for row_id, lesson_num, index, text in rows
+    ] + [(901, 4, len(rows) + 1, "taky pryč")]
+    conn = FakeConnection(FakeCursor(existing))
+    plan = kulicky_db.plan_sync(conn, lessons=[4])
+    assert sorted(row_id for row_id, _, _ in plan.deletes) == [900, 901]
+    assert len(plan.reorders) == len(rows)
+
+    cursor = FakeCursor()
+    kulicky_db.apply_sync(FakeConnection(cursor), plan)
+    assert all("DELETE" not in sql for sql, _ in cursor.executed)
+
+    cursor = FakeCursor()
+    conn = FakeConnection(cursor)
+    kulicky_db.apply_sync(conn, plan, prune=True)
+    sql, params = cursor.executed[0]
+    assert sql.startswith("DELETE") and sorted(params) == [(900,), (901,)]
+    assert conn.commits == 1
+
+
+def test_print_plan_warns_about_duplicate_positions_without_prune(capsys):
+    rows = catalog_rows(4)
+    count = len(rows)
+    # Řádek navíc na pozici 1 (kolize) a na pozici za koncem lekce (bez kolize)
+    existing = rows + [(900, 4, 1, "zastaralá kulička"), (901, 4, count, "další zastaralá")]
+    plan = kulicky_db.plan_sync(FakeConnection(FakeCursor(existing)), lessons=[4])
+
+    assert kulicky_db.colliding_positions(plan) == {4: [1]}
+    kulicky_db.print_plan(plan)
+    assert "duplicitní pozice (lekce 4: 1)" in capsys.readouterr().out
+    kulicky_db.print_plan(plan, prune=True)
+    assert "duplicitní" not in capsys.readouterr().out
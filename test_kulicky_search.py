@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Testy vyhledávání kulicky_search: diakritika, pádové koncovky a střídání
+í/ě ("peníze" / "peněz").
+
+    python -m pytest test_kulicky_search.py
+"""
+
+import pytest
+
+from kulicky_search import KulickySearchIndex, search, stem
+
+ITEMS = [
+    (4, 0, "peníze smrdí"),
+    (4, 1, "že vydělávání peněz je jen dřina"),
+    (4, 2, "neumím zacházet s penězi"),
+    (4, 3, "strach o peněženku"),
+    (5, 0, "strach z odmítnutí"),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KulickySearchIndex(ITEMS)
+
+
+def texts(hits):
+    return {hit.text for hit in hits}
+
+
+def test_stem_unifies_i_e_alternation():
+    assert stem("penize") == stem("penez") == stem("penezi") == stem("penezum") == stem("penezich")
+
+
+@pytest.mark.parametrize("query", ["penize", "peníze"])
+def test_nominative_query_finds_other_cases(index, query):
+    assert {"že vydělávání peněz je jen dřina", "neumím zacházet s penězi"} <= texts(index.search(query))
+
+
+@pytest.mark.parametrize("query", ["peněz", "penězi", "penez"])
+def test_other_cases_find_nominative(index, query):
+    assert "peníze smrdí" in texts(index.search(query))
+
+
+def test_ignores_case_and_diacritics(index):
+    assert texts(index.search("STRACH Z")) == {"strach z odmítnutí"}
+
+
+def test_lesson_filter(index):
+    assert {hit.lesson for hit in index.search("strach")} == {4, 5}
+    assert {hit.lesson for hit in index.search("strach", lesson=5)} == {5}
+
+
+def test_catalog_search_covers_both_directions():
+    forward = texts(search("penize", limit=100))
+    backward = texts(search("peněz", limit=100))
+    assert any("peněz" in text for text in forward)
+    assert any("peníze" in text for text in backward)